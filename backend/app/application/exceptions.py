@@ -20,3 +20,31 @@ class OAuthVerificationError(Exception):
 
 class EmailDispatchError(Exception):
     """Raised when verification emails fail to send."""
+
+
+class RateLimitExceededError(Exception):
+    """Raised when a client exceeds its request rate allowance."""
+
+    def __init__(self, message: str, *, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServiceOverloadedError(Exception):
+    """Raised when a request cannot be admitted before its queue deadline."""
+
+    def __init__(self, message: str, *, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelUnavailableError(Exception):
+    """Raised when the image model is failing or its circuit breaker is open."""
+
+    def __init__(self, message: str, *, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelTimeoutError(Exception):
+    """Raised when the image model does not answer within the request deadline."""
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from ..exceptions import RateLimitExceededError, ServiceOverloadedError
+
+
+class TokenBucket:
+    def __init__(self, *, rate_per_second: float, burst: int) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Consume one token; return 0 on success or the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate_per_second
+
+
+class AdmissionController:
+    """Bounds concurrent work with a FIFO wait queue and per-client rate limits."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        rate_per_second: float,
+        burst: int,
+        max_tracked_clients: int = 10_000,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_tracked_clients = max_tracked_clients
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._service_seconds = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _check_rate(self, client_key: Optional[str]) -> None:
+        if client_key is None or self.rate_per_second <= 0:
+            return
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            bucket = TokenBucket(rate_per_second=self.rate_per_second, burst=self.burst)
+            self._buckets[client_key] = bucket
+            while len(self._buckets) > self.max_tracked_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_key)
+        wait = bucket.take(time.monotonic())
+        if wait > 0:
+            raise RateLimitExceededError("Rate limit exceeded", retry_after=math.ceil(wait))
+
+    def _retry_after(self) -> int:
+        # Time for the current queue to drain, assuming the recent average service time.
+        backlog = (self.queued + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._service_seconds))
+
+    def try_acquire(self) -> bool:
+        """Take a free slot without queueing or rate limiting; False if none is free right now."""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self, client_key: Optional[str] = None) -> None:
+        self._check_rate(client_key)
+        if self.try_acquire():
+            return
+        if self.queued >= self.max_queue:
+            raise ServiceOverloadedError("Server is busy, try again later", retry_after=self._retry_after())
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the deadline expired; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise ServiceOverloadedError(
+                "Timed out waiting for capacity", retry_after=self._retry_after()
+            ) from exc
+
+    def _remove_waiter(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; ``active`` is unchanged.
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def observe_service_time(self, seconds: float) -> None:
+        self._service_seconds = 0.8 * self._service_seconds + 0.2 * seconds
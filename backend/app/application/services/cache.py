@@ -0,0 +1,18 @@
+from typing import Optional, Protocol
+
+
+class CacheBackend(Protocol):
+    """Byte-oriented cache shared by the services.
+
+    ``set`` and ``delete`` invalidate the key in every worker that shares the backend.
+    Backends treat their own failures as misses so callers can always fall back to
+    the source of truth.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def close(self) -> None: ...
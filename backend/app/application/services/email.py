@@ -3,10 +3,13 @@ from __future__ import annotations
 import asyncio
 import smtplib
 import ssl
+import time
 from email.message import EmailMessage
 from typing import Optional
 
 from ..exceptions import EmailDispatchError
+from ...core.metrics import SMTP_SEND_SECONDS
+from ...core.tracing import bind_context, span
 
 
 class EmailSender:
@@ -35,6 +38,18 @@ class EmailSender:
         self.use_tls = use_tls
         self.use_ssl = use_ssl
         self.reply_to = reply_to
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def warm_up(self) -> None:
+        """Build the TLS context ahead of the first send."""
+        # Loading the CA bundle takes a few milliseconds; do it once per sender.
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        self.warm_up()
+        return self._ssl_context
 
     async def send_verification_email(self, *, to_email: str, token: str) -> None:
         subject = "Verify your Need for Wheels account"
@@ -65,15 +80,21 @@ class EmailSender:
 
     async def _send(self, message: EmailMessage) -> None:
         loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        outcome = "error"
         try:
-            await loop.run_in_executor(None, self._send_sync, message)
+            with span("smtp.send", kind="client", **{"smtp.host": self.host}):
+                await loop.run_in_executor(None, bind_context(self._send_sync), message)
+            outcome = "ok"
         except EmailDispatchError:
             raise
         except Exception as exc:  # pragma: no cover - best effort logging
             raise EmailDispatchError("Unable to send verification email") from exc
+        finally:
+            SMTP_SEND_SECONDS.labels(outcome).observe(time.perf_counter() - start)
 
     def _send_sync(self, message: EmailMessage) -> None:
-        context = ssl.create_default_context()
+        context = self.ssl_context
         try:
             if self.use_ssl:
                 with smtplib.SMTP_SSL(self.host, self.port, context=context) as server:
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import io
+import json
+from dataclasses import dataclass
+from typing import Optional
+from uuid import uuid4
+
+from .cache import CacheBackend
+
+Image = tuple[bytes, str]
+
+
+@dataclass(slots=True)
+class GenerationInputs:
+    """Prompt and uploaded photos of one generation request, as sent by the client."""
+
+    prompt: str
+    car_images: list[Image]
+    wheel_image: Optional[Image]
+
+    def to_bytes(self) -> bytes:
+        images = [*self.car_images, *([self.wheel_image] if self.wheel_image is not None else [])]
+        header = {
+            "prompt": self.prompt,
+            "images": [[len(data), mime] for data, mime in images],
+            "wheel": self.wheel_image is not None,
+        }
+        return b"".join([json.dumps(header).encode(), b"\n", *(data for data, _ in images)])
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "GenerationInputs":
+        header_end = raw.index(b"\n")
+        header = json.loads(raw[:header_end])
+        images: list[Image] = []
+        offset = header_end + 1
+        for length, mime in header["images"]:
+            images.append((raw[offset : offset + length], mime))
+            offset += length
+        wheel = images.pop() if header["wheel"] else None
+        return cls(prompt=header["prompt"], car_images=images, wheel_image=wheel)
+
+
+class GenerationInputStore:
+    """Keeps a request's original uploads for a while so a later tier can reuse them."""
+
+    def __init__(self, cache: CacheBackend, *, ttl_seconds: float) -> None:
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+
+    async def save(self, inputs: GenerationInputs) -> str:
+        inputs_id = uuid4().hex
+        await self.cache.set(f"generate:inputs:{inputs_id}", inputs.to_bytes(), ttl_seconds=self.ttl_seconds)
+        return inputs_id
+
+    async def load(self, inputs_id: str) -> Optional[GenerationInputs]:
+        raw = await self.cache.get(f"generate:inputs:{inputs_id}")
+        return GenerationInputs.from_bytes(raw) if raw is not None else None
+
+
+def downscale_image(image: Image, *, max_edge: int, quality: int) -> Image:
+    """Shrink a photo so its longest edge is at most ``max_edge``.
+
+    Photos that are already small enough, or cannot be decoded, are returned as is.
+    Transparent images stay PNG so cut-out wheel photos keep their alpha.
+    """
+    from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+
+    data, mime = image
+    try:
+        with PILImage.open(io.BytesIO(data)) as src:
+            if max(src.size) <= max_edge:
+                return image
+            src.draft("RGB", (max_edge, max_edge))
+            img = ImageOps.exif_transpose(src)
+            img.thumbnail((max_edge, max_edge), PILImage.Resampling.LANCZOS)
+    except (UnidentifiedImageError, OSError):
+        return image
+    buf = io.BytesIO()
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        img.save(buf, "PNG")
+        return buf.getvalue(), "image/png"
+    img.convert("RGB").save(buf, "JPEG", quality=quality)
+    return buf.getvalue(), "image/jpeg"
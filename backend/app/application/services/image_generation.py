@@ -1,33 +1,110 @@
-from typing import Sequence, Optional
-from google import genai
-from google.genai import types
+import time
+from functools import lru_cache
+from typing import Any, Sequence, Optional
 from ...core.config import settings
+from ...core.metrics import IMAGE_GENERATION_BYTES, IMAGE_GENERATION_SECONDS
+from ...core.tracing import span
+from .resilience import CircuitBreaker, ResilientCaller
+
+
+@lru_cache(maxsize=1)
+def get_model_caller() -> ResilientCaller:
+    breaker = CircuitBreaker(
+        "image_model",
+        failure_rate=settings.generate_circuit_failure_rate,
+        min_calls=settings.generate_circuit_min_calls,
+        window_seconds=settings.generate_circuit_window_seconds,
+        open_seconds=settings.generate_circuit_open_seconds,
+    )
+    return ResilientCaller(
+        breaker,
+        max_workers=settings.generate_model_workers,
+        max_attempts=settings.generate_max_attempts,
+        backoff_base_seconds=settings.generate_retry_base_seconds,
+        backoff_max_seconds=settings.generate_retry_max_seconds,
+        hedge=settings.generate_hedge_enabled,
+        hedge_quantile=settings.generate_hedge_quantile,
+        hedge_min_samples=settings.generate_hedge_min_samples,
+    )
 
 
 class ImageGenerator:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        client: Optional[Any] = None,
+        caller: Optional[ResilientCaller] = None,
+    ):
+        self.caller = caller or get_model_caller()
+        if client is not None:
+            self.api_key = api_key
+            self.client = client
+            return
         self.api_key = api_key or settings.google_api_key
         if not self.api_key:
             raise RuntimeError("Missing Google API key (env var 'api_key')")
+        # google-genai is heavy to import; load it only when a generator is built.
+        from google import genai
+
         self.client = genai.Client(api_key=self.api_key)
 
+    def prepare_inputs(self, images: Sequence[tuple[bytes, str]]) -> list:
+        """Wrap uploaded images as request parts once so several calls can share them."""
+        from google.genai import types
+
+        return [types.Part(inline_data=types.Blob(mime_type=mime, data=data)) for data, mime in images]
+
     def generate(self, *, prompt: str, car_images: Sequence[tuple[bytes, str]], wheel_image: Optional[tuple[bytes, str]] = None) -> bytes:
-        parts: list = [prompt]
-        # Attach images as inline data parts
-        for data, mime in car_images:
-            parts.append(types.Part(inline_data=types.Blob(mime_type=mime, data=data)))
-        if wheel_image is not None:
-            data, mime = wheel_image
-            parts.append(types.Part(inline_data=types.Blob(mime_type=mime, data=data)))
-
-        resp = self.client.models.generate_content(
-            model="gemini-2.5-flash-image-preview",
-            contents=parts,
+        return self.generate_from_parts(
+            prompt=prompt,
+            car_parts=self.prepare_inputs(car_images),
+            wheel_parts=self.prepare_inputs([wheel_image]) if wheel_image is not None else [],
         )
 
+    async def generate_async(
+        self,
+        *,
+        prompt: str,
+        car_parts: Sequence,
+        wheel_parts: Sequence = (),
+        model: Optional[str] = None,
+    ) -> bytes:
+        """Call the model through the retry/hedging/circuit-breaker layer."""
+        return await self.caller.call(
+            lambda: self.generate_from_parts(prompt=prompt, car_parts=car_parts, wheel_parts=wheel_parts, model=model),
+            deadline_seconds=settings.generate_deadline_seconds,
+        )
+
+    def generate_from_parts(
+        self,
+        *,
+        prompt: str,
+        car_parts: Sequence,
+        wheel_parts: Sequence = (),
+        model: Optional[str] = None,
+    ) -> bytes:
+        model = model or settings.generate_full_model
+        parts: list = [prompt, *car_parts, *wheel_parts]
+        sent_bytes = sum(len(part.inline_data.data) for part in parts[1:])
+        IMAGE_GENERATION_BYTES.labels("sent").observe(sent_bytes)
+
+        start = time.perf_counter()
+        try:
+            with span("genai.generate_content", kind="client", model=model, sent_bytes=sent_bytes):
+                resp = self.client.models.generate_content(
+                    model=model,
+                    contents=parts,
+                )
+        except Exception:
+            IMAGE_GENERATION_SECONDS.labels(model, "error").observe(time.perf_counter() - start)
+            raise
+        IMAGE_GENERATION_SECONDS.labels(model, "ok").observe(time.perf_counter() - start)
+
         # Find first image in response parts
         for part in resp.candidates[0].content.parts:
             if getattr(part, "inline_data", None) is not None:
+                IMAGE_GENERATION_BYTES.labels("received").observe(len(part.inline_data.data))
                 return part.inline_data.data
         # If no image returned, attempt to return any text as bytes for debugging
         for part in resp.candidates[0].content.parts:
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Generic, Iterator, Optional, Sequence, TypeVar
+
+from ...domain.entities.fingerprint import InputFingerprint
+from ...domain.repositories.fingerprint_repository import FingerprintRepository
+
+V = TypeVar("V")
+
+_HASH_SIZE = 8
+_SAMPLE_SIZE = 32
+# DCT-II basis for the lowest ``_HASH_SIZE`` frequencies of a ``_SAMPLE_SIZE``-point signal.
+_COS = [
+    [math.cos((2 * x + 1) * u * math.pi / (2 * _SAMPLE_SIZE)) for x in range(_SAMPLE_SIZE)]
+    for u in range(_HASH_SIZE)
+]
+
+
+def perceptual_hash(image: bytes) -> int:
+    """64-bit pHash: signs of the low-frequency DCT coefficients of a 32x32 grayscale copy.
+
+    Resizing, re-compression and small colour shifts move few bits, so visually
+    identical uploads land within a small Hamming distance of each other.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image)) as src:
+        # JPEG decoders can downscale by 1/2..1/8 while decoding, which is most of the cost.
+        src.draft("L", (_SAMPLE_SIZE * 2, _SAMPLE_SIZE * 2))
+        img = ImageOps.exif_transpose(src).convert("L")
+    img = img.resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.Resampling.LANCZOS)
+    pixels = img.tobytes()
+
+    rows = [pixels[y * _SAMPLE_SIZE : (y + 1) * _SAMPLE_SIZE] for y in range(_SAMPLE_SIZE)]
+    row_coeffs = [[sum(p * c for p, c in zip(row, basis)) for basis in _COS] for row in rows]
+    coeffs = [
+        sum(row_coeffs[y][u] * _COS[v][y] for y in range(_SAMPLE_SIZE))
+        for v in range(_HASH_SIZE)
+        for u in range(_HASH_SIZE)
+    ]
+    # The DC term only tracks overall brightness; keep it out of the threshold.
+    median = sorted(coeffs[1:])[len(coeffs) // 2 - 1]
+    value = 0
+    for coeff in coeffs:
+        value = (value << 1) | (coeff > median)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def fingerprint_inputs(
+    *,
+    prompt: str,
+    car_images: Sequence[tuple[bytes, str]],
+    wheel_image: Optional[tuple[bytes, str]],
+    experiment_id: Optional[str] = None,
+) -> InputFingerprint:
+    """Hash every uploaded photo; raises if one of them cannot be decoded.
+
+    ``created_at`` is provisional; the repository stamps the stored row when it is saved.
+    """
+    return InputFingerprint(
+        experiment_id=experiment_id,
+        prompt_digest=hashlib.sha256(prompt.encode()).hexdigest(),
+        car_hashes=tuple(perceptual_hash(data) for data, _ in car_images),
+        wheel_hash=perceptual_hash(wheel_image[0]) if wheel_image is not None else None,
+        created_at=datetime.utcnow(),
+    )
+
+
+class BKTree(Generic[V]):
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance.
+
+    A radius-``r`` search only descends into children whose edge distance is within
+    ``r`` of the query's distance to the node, which prunes most of the tree for
+    small radii.
+    """
+
+    def __init__(self) -> None:
+        # Node: [hash, values, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: V) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> Iterator[tuple[int, V]]:
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(key, node[0])
+            if distance <= max_distance:
+                for value in node[1]:
+                    yield distance, value
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+
+
+class FingerprintIndex:
+    """Per-worker BK-tree of stored fingerprints, keyed on the first car photo's hash.
+
+    The tree is filled from the repository on first use and then topped up with rows
+    newer than the last one seen, at most every ``refresh_seconds``. Each poll looks
+    back ``overlap`` to pick up rows committed late; duplicates are skipped by id,
+    which is safe because a stored fingerprint is never updated. Rows are stamped by
+    the database at insert, so ``overlap`` only has to cover commit latency.
+    """
+
+    def __init__(self, *, refresh_seconds: float, overlap: timedelta = timedelta(minutes=1)) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.overlap = overlap
+        self._tree: BKTree[InputFingerprint] = BKTree()
+        self._ids: set[str] = set()
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def add(self, fingerprint: InputFingerprint) -> None:
+        if not fingerprint.car_hashes or fingerprint.experiment_id in self._ids:
+            return
+        self._ids.add(fingerprint.experiment_id)
+        self._tree.add(fingerprint.car_hashes[0], fingerprint)
+
+    async def refresh(self, repo: FingerprintRepository) -> None:
+        if time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at < self.refresh_seconds:
+                return
+            since = self._watermark - self.overlap if self._watermark is not None else None
+            for fingerprint in await repo.list_since(since):
+                self.add(fingerprint)
+                if self._watermark is None or fingerprint.created_at > self._watermark:
+                    self._watermark = fingerprint.created_at
+            self._refreshed_at = time.monotonic()
+
+    def nearest(self, query: InputFingerprint, *, max_distance: int) -> list[InputFingerprint]:
+        """Stored fingerprints whose prompt matches and whose photos are all within range, closest first."""
+        if not query.car_hashes:
+            return []
+        matches: list[tuple[int, InputFingerprint]] = []
+        for _, candidate in self._tree.search(query.car_hashes[0], max_distance):
+            if candidate.prompt_digest != query.prompt_digest:
+                continue
+            if len(candidate.car_hashes) != len(query.car_hashes):
+                continue
+            if (candidate.wheel_hash is None) != (query.wheel_hash is None):
+                continue
+            distances = [hamming_distance(a, b) for a, b in zip(query.car_hashes, candidate.car_hashes)]
+            if query.wheel_hash is not None:
+                distances.append(hamming_distance(query.wheel_hash, candidate.wheel_hash))
+            if max(distances) <= max_distance:
+                matches.append((sum(distances), candidate))
+        matches.sort(key=lambda match: (match[0], -match[1].created_at.timestamp()))
+        return [candidate for _, candidate in matches]
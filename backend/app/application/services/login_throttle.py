@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import struct
+import time
+from typing import Optional
+
+from ...core.metrics import LOGIN_LOCKOUTS, LOGIN_THROTTLED
+from ..exceptions import RateLimitExceededError
+from .cache import CacheBackend
+
+# window index, attempts in the previous window, attempts in the current window,
+# lockouts so far, locked until (epoch seconds)
+_STATE = struct.Struct("<qIIId")
+
+
+class LoginThrottle:
+    """Sliding-window attempt limits per account and per client IP, with escalating lockouts.
+
+    Counts are kept per fixed window and the previous window is weighted by how much of
+    it still overlaps the sliding window, so limits hold across window boundaries with
+    two counters per key. Reaching a limit locks the key for ``lockout_base_seconds``,
+    doubling on every further lockout up to ``lockout_max_seconds``; the escalation
+    resets once a key sees no attempts for two windows.
+
+    State lives in a :class:`CacheBackend`, so it is per worker with the memory cache
+    and shared with the shared-memory or Redis caches. Read-modify-write is not atomic
+    across workers; concurrent attempts can overshoot a limit by the number of workers.
+    """
+
+    def __init__(
+        self,
+        store: CacheBackend,
+        *,
+        email_limit: int,
+        ip_limit: int,
+        window_seconds: float,
+        lockout_base_seconds: float,
+        lockout_max_seconds: float,
+    ) -> None:
+        self.store = store
+        self.limits = {"email": email_limit, "ip": ip_limit}
+        self.window_seconds = window_seconds
+        self.lockout_base_seconds = lockout_base_seconds
+        self.lockout_max_seconds = lockout_max_seconds
+
+    @staticmethod
+    def _key(scope: str, value: str) -> str:
+        # Hashed so addresses and client keys of any length fit the cache key budget.
+        return f"login:throttle:{scope}:{hashlib.blake2b(value.encode(), digest_size=16).hexdigest()}"
+
+    async def _hit(self, scope: str, value: str, now: float) -> None:
+        key = self._key(scope, value)
+        raw = await self.store.get(key)
+        window, previous, current, lockouts, locked_until = (
+            _STATE.unpack(raw) if raw is not None else (0, 0, 0, 0, 0.0)
+        )
+        if locked_until > now:
+            LOGIN_THROTTLED.labels(scope).inc()
+            raise RateLimitExceededError("Too many login attempts", retry_after=math.ceil(locked_until - now))
+
+        index = int(now // self.window_seconds)
+        if index != window:
+            previous = current if index == window + 1 else 0
+            current = 0
+            window = index
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+        if previous * overlap + current >= self.limits[scope]:
+            lockouts += 1
+            duration = min(self.lockout_max_seconds, self.lockout_base_seconds * 2 ** (lockouts - 1))
+            await self.store.set(
+                key,
+                _STATE.pack(index, 0, 0, lockouts, now + duration),
+                ttl_seconds=duration + self.window_seconds,
+            )
+            LOGIN_LOCKOUTS.labels(scope).inc()
+            LOGIN_THROTTLED.labels(scope).inc()
+            raise RateLimitExceededError("Too many login attempts", retry_after=math.ceil(duration))
+
+        await self.store.set(
+            key,
+            _STATE.pack(window, previous, current + 1, lockouts, locked_until),
+            ttl_seconds=2 * self.window_seconds,
+        )
+
+    async def hit(self, *, email: str, client_key: Optional[str]) -> None:
+        """Count one attempt, or raise ``RateLimitExceededError`` if the caller must wait."""
+        now = time.time()
+        if client_key is not None:
+            await self._hit("ip", client_key, now)
+        await self._hit("email", email, now)
+
+    async def _refund(self, scope: str, value: str, now: float) -> None:
+        key = self._key(scope, value)
+        raw = await self.store.get(key)
+        if raw is None:
+            return
+        window, previous, current, lockouts, locked_until = _STATE.unpack(raw)
+        # Only this window's count can still hold the attempt; older ones have aged out.
+        if window != int(now // self.window_seconds) or current == 0:
+            return
+        await self.store.set(
+            key,
+            _STATE.pack(window, previous, current - 1, lockouts, locked_until),
+            ttl_seconds=2 * self.window_seconds,
+        )
+
+    async def reset(self, *, email: str, client_key: Optional[str] = None) -> None:
+        """Forget an account's attempts after a successful login and take the login back
+        off the client's count, so only failures use up a shared address's budget."""
+        await self.store.delete(self._key("email", email))
+        if client_key is not None:
+            await self._refund("ip", client_key, time.time())
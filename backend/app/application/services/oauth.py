@@ -1,16 +1,59 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import re
+import time
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
-import httpx
-import jwt
-from jwt import jwk_from_dict
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-
+from .cache import CacheBackend
 from ..exceptions import OAuthVerificationError
+from ...core.metrics import JWKS_CACHE_LOOKUPS, OAUTH_PROVIDER_SECONDS
+from ...core.tracing import span
+
+APPLE_KEYS_CACHE_KEY = "oauth:apple:jwks"
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+
+class _GoogleCertsRequest:
+    """google-auth transport that keeps Google's signing certs until they expire.
+
+    ``verify_oauth2_token`` downloads the certs on every call. They are served with a
+    ``Cache-Control: max-age`` of several hours, so one copy per worker is enough;
+    other requests pass through on a shared keep-alive session.
+    """
+
+    def __init__(self, *, default_ttl_seconds: float = 3600) -> None:
+        from google.auth.transport import requests as google_requests
+
+        self._request = google_requests.Request()
+        self.default_ttl_seconds = default_ttl_seconds
+        self._certs: Any = None
+        self._expires_at = 0.0
+
+    def _ttl(self, cache_control: Optional[str]) -> float:
+        match = re.search(r"max-age=(\d+)", cache_control or "")
+        return float(match.group(1)) if match else self.default_ttl_seconds
+
+    def __call__(self, url: str, method: str = "GET", **kwargs: Any) -> Any:
+        if url != GOOGLE_CERTS_URL or method != "GET":
+            return self._request(url, method=method, **kwargs)
+        now = time.monotonic()
+        if self._certs is not None and self._expires_at > now:
+            JWKS_CACHE_LOOKUPS.labels("google", "hit").inc()
+            return self._certs
+        JWKS_CACHE_LOOKUPS.labels("google", "miss").inc()
+        start = time.perf_counter()
+        try:
+            with span("google.fetch_certs", kind="client", **{"http.url": url}):
+                response = self._request(url, method=method, **kwargs)
+        finally:
+            OAUTH_PROVIDER_SECONDS.labels("google", "fetch_certs").observe(time.perf_counter() - start)
+        if response.status == 200:
+            self._certs = response
+            self._expires_at = now + self._ttl(response.headers.get("cache-control"))
+        return response
 
 
 class OAuthVerifier:
@@ -21,6 +64,7 @@ class OAuthVerifier:
         apple_client_id: Optional[str] = None,
         apple_keys_url: str = "https://appleid.apple.com/auth/keys",
         apple_cache_ttl_hours: int = 6,
+        cache: Optional[CacheBackend] = None,
     ) -> None:
         self.google_client_id = google_client_id
         self.apple_client_id = apple_client_id
@@ -28,6 +72,22 @@ class OAuthVerifier:
         self.apple_cache_ttl = timedelta(hours=apple_cache_ttl_hours)
         self._apple_keys: dict[str, Any] | None = None
         self._apple_keys_expiry: Optional[datetime] = None
+        self._google_request: Optional[_GoogleCertsRequest] = None
+        self.cache = cache
+
+    def _google_transport(self) -> _GoogleCertsRequest:
+        if self._google_request is None:
+            self._google_request = _GoogleCertsRequest()
+        return self._google_request
+
+    async def prefetch_keys(self) -> None:
+        """Load the signing keys of every configured provider ahead of the first sign-in."""
+        fetches = []
+        if self.google_client_id:
+            fetches.append(asyncio.to_thread(self._google_transport(), GOOGLE_CERTS_URL))
+        if self.apple_client_id:
+            fetches.append(self._get_apple_keys())
+        await asyncio.gather(*fetches)
 
     async def verify(
         self,
@@ -56,14 +116,21 @@ class OAuthVerifier:
     async def _verify_google(self, token: str, *, token_type: str = "id_token") -> dict[str, Any]:
         if token_type == "access_token":
             return await self._verify_google_access_token(token)
+        # Provider SDKs are imported on first use to keep worker start-up fast.
+        from google.oauth2 import id_token
+
+        start = time.perf_counter()
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token,
-                google_requests.Request(),
-                audience=self.google_client_id,
-            )
+            with span("google.verify_id_token", kind="client"):
+                idinfo = id_token.verify_oauth2_token(
+                    token,
+                    self._google_transport(),
+                    audience=self.google_client_id,
+                )
         except ValueError as exc:
             raise OAuthVerificationError("Invalid Google identity token") from exc
+        finally:
+            OAUTH_PROVIDER_SECONDS.labels("google", "verify_id_token").observe(time.perf_counter() - start)
 
         email = idinfo.get("email")
         if not email:
@@ -79,17 +146,23 @@ class OAuthVerifier:
         }
 
     async def _verify_google_access_token(self, token: str) -> dict[str, Any]:
+        import httpx
+
         userinfo_endpoint = "https://www.googleapis.com/oauth2/v3/userinfo"
+        start = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(
-                    userinfo_endpoint,
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                resp.raise_for_status()
-                data = resp.json()
+            with span("google.userinfo", kind="client", **{"http.url": userinfo_endpoint}):
+                async with httpx.AsyncClient(timeout=10) as client:
+                    resp = await client.get(
+                        userinfo_endpoint,
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                    resp.raise_for_status()
+                    data = resp.json()
         except httpx.HTTPError as exc:
             raise OAuthVerificationError("Unable to validate Google access token") from exc
+        finally:
+            OAUTH_PROVIDER_SECONDS.labels("google", "userinfo").observe(time.perf_counter() - start)
 
         email = data.get("email")
         if not email:
@@ -105,6 +178,8 @@ class OAuthVerifier:
         }
 
     async def _verify_apple(self, token: str) -> dict[str, Any]:
+        import jwt
+
         try:
             headers = jwt.get_unverified_header(token)
             kid = headers.get("kid")
@@ -115,8 +190,7 @@ class OAuthVerifier:
                 raise OAuthVerificationError("Apple signing key not found")
 
             try:
-                jwk = jwk_from_dict(key)
-                public_key = jwk.key
+                public_key = jwt.PyJWK(key, algorithm="RS256").key
             except Exception as exc:  # pragma: no cover - jwk parsing errors are rare
                 raise OAuthVerificationError("Unable to parse Apple signing key") from exc
             options = {"verify_aud": self.apple_client_id is not None}
@@ -150,17 +224,39 @@ class OAuthVerifier:
     async def _get_apple_keys(self) -> dict[str, Any]:
         now = datetime.utcnow()
         if self._apple_keys and self._apple_keys_expiry and self._apple_keys_expiry > now:
+            JWKS_CACHE_LOOKUPS.labels("apple", "hit").inc()
             return self._apple_keys
+        if self.cache is not None:
+            cached = await self.cache.get(APPLE_KEYS_CACHE_KEY)
+            if cached is not None:
+                JWKS_CACHE_LOOKUPS.labels("apple", "shared_hit").inc()
+                entry = json.loads(cached)
+                self._apple_keys = entry["keys"]
+                self._apple_keys_expiry = datetime.fromisoformat(entry["expires_at"])
+                return self._apple_keys
+        JWKS_CACHE_LOOKUPS.labels("apple", "miss").inc()
+        import httpx
 
+        start = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(self.apple_keys_url)
-                resp.raise_for_status()
-                payload = resp.json()
+            with span("apple.fetch_keys", kind="client", **{"http.url": self.apple_keys_url}):
+                async with httpx.AsyncClient(timeout=10) as client:
+                    resp = await client.get(self.apple_keys_url)
+                    resp.raise_for_status()
+                    payload = resp.json()
         except httpx.HTTPError as exc:
             raise OAuthVerificationError("Unable to fetch Apple signing keys") from exc
+        finally:
+            OAUTH_PROVIDER_SECONDS.labels("apple", "fetch_keys").observe(time.perf_counter() - start)
 
         keys = {item["kid"]: item for item in payload.get("keys", []) if "kid" in item}
         self._apple_keys = keys
         self._apple_keys_expiry = now + self.apple_cache_ttl
+        if self.cache is not None:
+            entry = {"keys": keys, "expires_at": self._apple_keys_expiry.isoformat()}
+            await self.cache.set(
+                APPLE_KEYS_CACHE_KEY,
+                json.dumps(entry).encode(),
+                ttl_seconds=self.apple_cache_ttl.total_seconds(),
+            )
         return keys
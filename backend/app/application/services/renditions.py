@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from ...core.metrics import RENDITION_BYTES, RENDITION_SECONDS
+from ...domain.entities.rendition import ExperimentRendition
+
+# Longest edge in pixels; each size is derived from the next larger one.
+RENDITION_SIZES = {"medium": 1024, "thumb": 320}
+FULL_SIZE = "full"
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png"}
+
+Encoded = tuple[str, str, int, int, bytes]
+
+
+def _encoders() -> list[str]:
+    from PIL import Image, features
+
+    try:
+        import pillow_avif  # noqa: F401 - registers an AVIF encoder on Pillow releases without one
+    except ImportError:
+        pass
+    Image.init()
+    formats = []
+    if "AVIF" in Image.SAVE:
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    formats.append("png")
+    return formats
+
+
+def render_renditions(image: bytes, quality: int) -> list[Encoded]:
+    """Decode ``image`` once and encode every size in every available format.
+
+    Runs in a worker process. The original is kept as the ``full`` rendition when it is
+    already in a servable format and re-encoded as PNG otherwise.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image)) as src:
+        source_format = (src.format or "").lower()
+        img = ImageOps.exif_transpose(src)
+        img.load()
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    out: list[Encoded] = []
+    if source_format in MEDIA_TYPES:
+        out.append((FULL_SIZE, source_format, img.width, img.height, image))
+    else:
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        out.append((FULL_SIZE, "png", img.width, img.height, buf.getvalue()))
+
+    formats = _encoders()
+    for size, edge in RENDITION_SIZES.items():
+        img.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        for fmt in formats:
+            buf = io.BytesIO()
+            if fmt == "png":
+                img.save(buf, "PNG", optimize=size == "thumb")
+            elif fmt == "webp":
+                img.save(buf, "WEBP", quality=quality, method=4)
+            else:
+                img.save(buf, "AVIF", quality=quality)
+            out.append((size, fmt, img.width, img.height, buf.getvalue()))
+    return out
+
+
+def preferred_formats(accept: Optional[str]) -> list[str]:
+    """Formats the client explicitly accepts, best first, always ending with PNG.
+
+    Wildcards are not taken as AVIF/WebP support, since older clients send ``*/*``.
+    """
+    accepted: dict[str, float] = {}
+    for item in (accept or "").split(","):
+        media_type, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[media_type.strip().lower()] = q
+    formats = [fmt for fmt in ("avif", "webp") if accepted.get(MEDIA_TYPES[fmt], 0) > 0]
+    formats.sort(key=lambda fmt: -accepted[MEDIA_TYPES[fmt]])
+    return formats + ["png"]
+
+
+class RenditionPipeline:
+    """Encodes renditions in a process pool, keeping Pillow off the event loop and the GIL."""
+
+    def __init__(self, *, max_workers: int, quality: int) -> None:
+        self.max_workers = max_workers
+        self.quality = quality
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # forkserver children do not inherit the server's threads or open sockets.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._pool
+
+    async def render(self, experiment_id: str, image: bytes) -> list[ExperimentRendition]:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            encoded = await loop.run_in_executor(self._executor(), render_renditions, image, self.quality)
+        except Exception:
+            RENDITION_SECONDS.labels("error").observe(time.perf_counter() - start)
+            raise
+        RENDITION_SECONDS.labels("ok").observe(time.perf_counter() - start)
+
+        now = datetime.utcnow()
+        renditions = []
+        for size, fmt, width, height, data in encoded:
+            RENDITION_BYTES.labels(size, fmt).observe(len(data))
+            renditions.append(
+                ExperimentRendition(
+                    experiment_id=experiment_id,
+                    size=size,
+                    format=fmt,
+                    width=width,
+                    height=height,
+                    data=data,
+                    created_at=now,
+                )
+            )
+        return renditions
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
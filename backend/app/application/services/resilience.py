@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from ...core.metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, MODEL_CALL_ATTEMPTS, MODEL_HEDGES
+from ...core.tracing import bind_context
+from ..exceptions import ModelTimeoutError, ModelUnavailableError
+
+T = TypeVar("T")
+
+# Status codes worth another attempt: throttling, provider-side failures and gateway timeouts.
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def is_transient(exc: BaseException) -> bool:
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code in TRANSIENT_STATUS
+    # requests' and httpx' transport errors both derive from OSError.
+    return isinstance(exc, (OSError, TimeoutError))
+
+
+class CircuitBreaker:
+    """Fails fast while the failure rate over a rolling window is above ``failure_rate``.
+
+    After ``open_seconds`` a single probe call is let through; its outcome closes the
+    circuit again or restarts the open period. Only used from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate: float,
+        min_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        self._events: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        CIRCUIT_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def _trim(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - self.window_seconds:
+            _, ok = self._events.popleft()
+            if not ok:
+                self._failures -= 1
+
+    def allow(self) -> None:
+        """Raise ``ModelUnavailableError`` unless a call may be made now."""
+        now = time.monotonic()
+        if self.state == OPEN:
+            remaining = self.opened_at + self.open_seconds - now
+            if remaining > 0:
+                CIRCUIT_REJECTIONS.labels(self.name).inc()
+                raise ModelUnavailableError(
+                    "Image model is unavailable, try again later", retry_after=math.ceil(remaining)
+                )
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                CIRCUIT_REJECTIONS.labels(self.name).inc()
+                raise ModelUnavailableError("Image model is unavailable, try again later", retry_after=1)
+            self._probing = True
+
+    def abandon(self) -> None:
+        """Give up a probe whose outcome will never be recorded."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def record(self, ok: bool) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok:
+                self._events.clear()
+                self._failures = 0
+                self._set_state(CLOSED)
+            else:
+                self.opened_at = now
+                self._set_state(OPEN)
+            return
+        self._events.append((now, ok))
+        if not ok:
+            self._failures += 1
+        self._trim(now)
+        if (
+            self.state == CLOSED
+            and len(self._events) >= self.min_calls
+            and self._failures / len(self._events) >= self.failure_rate
+        ):
+            self.opened_at = now
+            self._set_state(OPEN)
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls, for hedging thresholds."""
+
+    def __init__(self, *, size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class ResilientCaller:
+    """Runs a blocking call with a deadline, jittered retries, optional hedging and a breaker.
+
+    Attempts run on a dedicated thread pool so a stalled provider cannot exhaust the
+    server's shared threadpool. A retry is only started when its backoff still fits in
+    the deadline. With hedging on, a second attempt is started once the first has run
+    longer than the ``hedge_quantile`` of recent latencies, and the first result wins.
+    Threads cannot be interrupted, so an abandoned attempt runs to completion in the
+    background; its slot in the pool is what bounds the damage.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        *,
+        max_workers: int,
+        max_attempts: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+    ) -> None:
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{breaker.name}-call")
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or self.breaker.state != CLOSED or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.quantile(self.hedge_quantile)
+
+    async def _run(self, fn: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._executor, bind_context(fn))
+        except asyncio.CancelledError:
+            MODEL_CALL_ATTEMPTS.labels("abandoned").inc()
+            raise
+        except Exception as exc:
+            transient = is_transient(exc)
+            MODEL_CALL_ATTEMPTS.labels("transient_error" if transient else "error").inc()
+            # A rejected request still shows the provider is up.
+            self.breaker.record(not transient)
+            raise
+        MODEL_CALL_ATTEMPTS.labels("ok").inc()
+        self.breaker.record(True)
+        self.latencies.add(time.perf_counter() - start)
+        return result
+
+    async def _attempt(self, fn: Callable[[], T]) -> T:
+        pending = {asyncio.ensure_future(self._run(fn))}
+        primary = next(iter(pending))
+        error: Optional[BaseException] = None
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    MODEL_HEDGES.labels("launched").inc()
+                    pending.add(asyncio.ensure_future(self._run(fn)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            MODEL_HEDGES.labels("won").inc()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], T], *, deadline_seconds: float) -> T:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_attempts):
+            self.breaker.allow()
+            try:
+                return await asyncio.wait_for(self._attempt(fn), deadline - loop.time())
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except asyncio.TimeoutError:
+                self.breaker.record(False)
+                raise ModelTimeoutError("Image model did not respond in time") from last_error
+            except Exception as exc:
+                if not is_transient(exc):
+                    raise
+                last_error = exc
+            # Full jitter keeps retries from many workers from arriving in lockstep.
+            backoff = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt))
+            if attempt + 1 == self.max_attempts or loop.time() + backoff >= deadline:
+                break
+            await asyncio.sleep(backoff)
+        raise ModelUnavailableError("Image model is unavailable, try again later", retry_after=1) from last_error
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,92 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
-from passlib.context import CryptContext
-import jwt
+from ...core.metrics import BCRYPT_ROUNDS, PASSWORD_HASH_SECONDS
+
+# bcrypt's own bounds on the cost factor.
+BCRYPT_MIN_COST = 4
+BCRYPT_MAX_COST = 31
+
+
+def measure_bcrypt_seconds(rounds: int, *, samples: int = 3) -> float:
+    """Best-of-``samples`` wall time of one bcrypt hash at ``rounds`` on this machine."""
+    from passlib.hash import bcrypt
+
+    handler = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_bcrypt_rounds(
+    target_seconds: float,
+    *,
+    min_rounds: int = 12,
+    max_rounds: int = 16,
+    probe_rounds: int = 8,
+    samples: int = 3,
+) -> int:
+    """Highest cost whose hash time on this machine stays within ``target_seconds``.
+
+    Each extra round doubles the work, so one cheap probe is enough to extrapolate.
+    Never goes below ``min_rounds``, even on hardware too slow to meet the target.
+    """
+    seconds_per_unit = measure_bcrypt_seconds(probe_rounds, samples=samples) / 2**probe_rounds
+    rounds = min_rounds
+    while rounds < max_rounds and seconds_per_unit * 2 ** (rounds + 1) <= target_seconds:
+        rounds += 1
+    return rounds
 
 
 class PasswordHasher:
-    def __init__(self) -> None:
-        self._ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    """bcrypt hashing at ``rounds``; stored hashes below ``min_rounds`` need updating.
+
+    Hashes are only ever rehashed upwards. A stored hash above ``rounds``, e.g. one written
+    on a faster instance type, is kept as is rather than weakened to this machine's cost.
+    """
+
+    def __init__(self, *, rounds: Optional[int] = None, min_rounds: Optional[int] = None) -> None:
+        from passlib.context import CryptContext
+
+        options: dict[str, Any] = {}
+        if rounds is not None and min_rounds is not None:
+            # New hashes below the floor would be flagged for rehashing on every login.
+            rounds = max(rounds, min_rounds)
+        if rounds is not None:
+            options["bcrypt__default_rounds"] = rounds
+            BCRYPT_ROUNDS.set(rounds)
+        if min_rounds is not None:
+            options["bcrypt__min_rounds"] = min_rounds
+        self.rounds = rounds
+        self._ctx = CryptContext(schemes=["bcrypt"], deprecated="auto", **options)
 
     def hash(self, password: str) -> str:
-        return self._ctx.hash(password)
+        start = time.perf_counter()
+        try:
+            return self._ctx.hash(password)
+        finally:
+            PASSWORD_HASH_SECONDS.labels("hash").observe(time.perf_counter() - start)
 
     def verify(self, password: str, hashed: str) -> bool:
-        return self._ctx.verify(password, hashed)
+        start = time.perf_counter()
+        try:
+            return self._ctx.verify(password, hashed)
+        finally:
+            PASSWORD_HASH_SECONDS.labels("verify").observe(time.perf_counter() - start)
+
+    def verify_and_update(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        """Verify ``password``; on success also return a new hash if ``hashed`` is out of policy."""
+        if not self.verify(password, hashed):
+            return False, None
+        if not self._ctx.needs_update(hashed):
+            return True, None
+        return True, self.hash(password)
 
 
 class TokenService:
@@ -36,7 +107,11 @@ class TokenService:
         payload: dict[str, Any] = {"sub": subject, "iat": int(now.timestamp()), "exp": int(exp.timestamp())}
         if extra:
             payload.update(extra)
+        import jwt
+
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
 
     def decode(self, token: str) -> dict[str, Any]:
+        import jwt
+
         return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
@@ -1,20 +1,39 @@
 from datetime import datetime
+from typing import Optional
+
 from ...domain.entities.experiment import Experiment
 from ...domain.repositories.experiment_repository import ExperimentRepository
+from ..services.cache import CacheBackend
+from .list_experiments import LIST_VERSION_KEY, new_list_version
+from ...core.tracing import traced
 
 
 class CreateExperiment:
-    def __init__(self, repo: ExperimentRepository):
+    def __init__(self, repo: ExperimentRepository, cache: Optional[CacheBackend] = None):
         self.repo = repo
+        self.cache = cache
 
-    async def execute(self, *, id: str, brand: str | None, model: str | None, year: str | None, created_at: datetime | None = None) -> Experiment:
+    @traced()
+    async def execute(
+        self,
+        *,
+        id: str,
+        brand: str | None,
+        model: str | None,
+        year: str | None,
+        created_at: datetime | None = None,
+        user_id: str | None = None,
+    ) -> Experiment:
         exp = Experiment(
             id=id,
             brand=brand,
             model=model,
             year=year,
             created_at=created_at or datetime.utcnow(),
+            user_id=user_id,
         )
         await self.repo.create(exp)
+        if self.cache is not None:
+            # Moving every worker to a new version orphans all cached listing pages at once.
+            await self.cache.set(LIST_VERSION_KEY, new_list_version())
         return exp
-
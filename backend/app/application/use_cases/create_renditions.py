@@ -0,0 +1,16 @@
+from ...domain.entities.rendition import ExperimentRendition
+from ...domain.repositories.rendition_repository import RenditionRepository
+from ..services.renditions import RenditionPipeline
+from ...core.tracing import traced
+
+
+class CreateRenditions:
+    def __init__(self, repo: RenditionRepository, pipeline: RenditionPipeline):
+        self.repo = repo
+        self.pipeline = pipeline
+
+    @traced()
+    async def execute(self, *, experiment_id: str, image: bytes) -> list[ExperimentRendition]:
+        renditions = await self.pipeline.render(experiment_id, image)
+        await self.repo.save_many(renditions)
+        return renditions
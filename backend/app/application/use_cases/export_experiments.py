@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from ...core.metrics import EXPORT_ROWS
+from ...core.tracing import traced
+from ...domain.repositories.experiment_repository import ExperimentRepository
+
+# Owners are left out on purpose: the export is public and user ids are not.
+EXPORT_FIELDS = ("id", "brand", "model", "year", "created_at")
+
+
+class ExportExperiments:
+    def __init__(self, repo: ExperimentRepository):
+        self.repo = repo
+
+    @traced()
+    async def execute(
+        self,
+        *,
+        format: str = "ndjson",
+        since: Optional[datetime] = None,
+        since_id: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[bytes]:
+        """Encode experiments as NDJSON or CSV, yielding one chunk per repository batch.
+
+        The last row's ``created_at`` and ``id`` are the watermark for the next export.
+        """
+        if format == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_FIELDS)
+            yield buf.getvalue().encode()
+
+        async for batch in self.repo.stream(since=since, since_id=since_id, batch_size=batch_size):
+            if format == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows(
+                    (e.id, e.brand, e.model, e.year, e.created_at.isoformat()) for e in batch
+                )
+                chunk = buf.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps({**{f: getattr(e, f) for f in EXPORT_FIELDS}, "created_at": e.created_at.isoformat()})
+                    + "\n"
+                    for e in batch
+                )
+            EXPORT_ROWS.labels(format).inc(len(batch))
+            yield chunk.encode()
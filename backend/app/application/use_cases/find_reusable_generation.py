@@ -0,0 +1,46 @@
+from typing import Optional
+from ...domain.entities.fingerprint import InputFingerprint
+from ...domain.entities.rendition import ExperimentRendition
+from ...domain.repositories.fingerprint_repository import FingerprintRepository
+from ...domain.repositories.rendition_repository import RenditionRepository
+from ..services.image_hashing import FingerprintIndex
+from ..services.renditions import FULL_SIZE, MEDIA_TYPES
+from ...core.tracing import traced
+
+
+class FindReusableGeneration:
+    """Finds the stored full-size result of an earlier run with near-identical inputs.
+
+    Only anonymous experiments and the caller's own are candidates; another user's
+    result is never handed out.
+    """
+
+    def __init__(
+        self,
+        index: FingerprintIndex,
+        fingerprints: FingerprintRepository,
+        renditions: RenditionRepository,
+        *,
+        max_distance: int,
+    ):
+        self.index = index
+        self.fingerprints = fingerprints
+        self.renditions = renditions
+        self.max_distance = max_distance
+
+    @traced()
+    async def execute(
+        self, fingerprint: InputFingerprint, *, user_id: Optional[str] = None
+    ) -> Optional[ExperimentRendition]:
+        await self.index.refresh(self.fingerprints)
+        candidates = [
+            candidate
+            for candidate in self.index.nearest(fingerprint, max_distance=self.max_distance)
+            if candidate.user_id is None or candidate.user_id == user_id
+        ]
+        for candidate in candidates[:3]:
+            # The index may still hold experiments that were deleted since it was loaded.
+            rendition = await self.renditions.get(candidate.experiment_id, size=FULL_SIZE, formats=list(MEDIA_TYPES))
+            if rendition is not None:
+                return rendition
+        return None
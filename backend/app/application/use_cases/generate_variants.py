@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence
+
+from ..services.admission import AdmissionController
+from ..services.image_generation import ImageGenerator
+from ...core.tracing import traced
+
+
+@dataclass(slots=True)
+class VariantResult:
+    index: int
+    wheel_index: int
+    variant: int
+    image: Optional[bytes] = None
+    error: Optional[str] = None
+
+
+class GenerateVariants:
+    """Generates ``variants`` images per wheel photo against one shared set of car inputs.
+
+    Calls go through the generator's resilience layer, at most ``max_concurrency`` at a time, and results are
+    yielded in completion order so callers can stream them.
+
+    With ``admission``, the request's own admission slot covers one call at a time and
+    every further concurrent call must take a free slot of its own, so a batch never
+    pushes the model calls in flight past the global limit. It does not queue for
+    them: without spare capacity the batch runs one call at a time.
+    """
+
+    def __init__(
+        self,
+        generator: ImageGenerator,
+        *,
+        max_concurrency: int,
+        admission: Optional[AdmissionController] = None,
+    ) -> None:
+        self.generator = generator
+        self.max_concurrency = max_concurrency
+        self.admission = admission
+
+    @traced()
+    async def execute(
+        self,
+        *,
+        prompt: str,
+        car_images: Sequence[tuple[bytes, str]],
+        wheel_images: Sequence[tuple[bytes, str]],
+        variants: int,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[VariantResult]:
+        car_parts = self.generator.prepare_inputs(car_images)
+        wheel_parts = [self.generator.prepare_inputs([wheel]) for wheel in wheel_images]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        own_slot = asyncio.Lock()
+
+        async def call(result: VariantResult) -> None:
+            try:
+                result.image = await self.generator.generate_async(
+                    prompt=prompt,
+                    car_parts=car_parts,
+                    wheel_parts=wheel_parts[result.wheel_index],
+                    model=model,
+                )
+            except Exception as exc:
+                result.error = str(exc)
+
+        async def run(result: VariantResult) -> VariantResult:
+            async with semaphore:
+                if self.admission is None:
+                    await call(result)
+                elif own_slot.locked() and self.admission.try_acquire():
+                    try:
+                        await call(result)
+                    finally:
+                        self.admission.release()
+                else:
+                    async with own_slot:
+                        await call(result)
+            return result
+
+        jobs = [
+            VariantResult(index=len(wheel_parts) * variant + wheel_index, wheel_index=wheel_index, variant=variant)
+            for variant in range(variants)
+            for wheel_index in range(len(wheel_parts))
+        ]
+        tasks = [asyncio.create_task(run(job)) for job in jobs]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # A client that disconnects mid-stream should not keep queued calls alive.
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,49 @@
+import json
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from ...core.metrics import CACHE_LOOKUPS
+from ...core.tracing import traced
+from ...domain.entities.experiment import FacetCount
+from ...domain.repositories.experiment_repository import ExperimentRepository
+from ..services.cache import CacheBackend
+from .list_experiments import current_list_version
+
+
+class GetExperimentFacets:
+    def __init__(
+        self,
+        repo: ExperimentRepository,
+        cache: Optional[CacheBackend] = None,
+        *,
+        ttl_seconds: float = 300,
+        settle_seconds: float = 0,
+    ):
+        self.repo = repo
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+
+    @traced()
+    async def execute(self, *, limit: int = 50) -> dict[str, list[FacetCount]]:
+        if self.cache is None:
+            return await self.repo.facet_counts(limit=limit)
+
+        # Keyed by the listing version, so every CreateExperiment invalidates the counts.
+        version, bumped_at = await current_list_version(self.cache)
+        key = f"experiments:facets:{version}:{limit}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.labels("experiment_facets", "hit").inc()
+            return {
+                dimension: [FacetCount(**item) for item in items]
+                for dimension, items in json.loads(cached).items()
+            }
+
+        CACHE_LOOKUPS.labels("experiment_facets", "miss").inc()
+        facets = await self.repo.facet_counts(limit=limit)
+        if time.time() - bumped_at >= self.settle_seconds:
+            payload = {dimension: [asdict(f) for f in items] for dimension, items in facets.items()}
+            await self.cache.set(key, json.dumps(payload).encode(), ttl_seconds=self.ttl_seconds)
+        return facets
@@ -0,0 +1,52 @@
+import json
+import time
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from ...core.metrics import CACHE_LOOKUPS
+from ...core.tracing import traced
+from ...domain.entities.experiment import DailyCount, ExperimentStats, FacetCount
+from ...domain.repositories.experiment_repository import ExperimentRepository
+from ..services.cache import CacheBackend
+from .list_experiments import current_list_version
+
+
+class GetExperimentStats:
+    def __init__(
+        self,
+        repo: ExperimentRepository,
+        cache: Optional[CacheBackend] = None,
+        *,
+        ttl_seconds: float = 300,
+        settle_seconds: float = 0,
+    ):
+        self.repo = repo
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+
+    @traced()
+    async def execute(self, *, days: int = 30, limit: int = 20) -> ExperimentStats:
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        if self.cache is None:
+            return await self.repo.stats(since=since, limit=limit)
+
+        version, bumped_at = await current_list_version(self.cache)
+        key = f"experiments:stats:{version}:{since.isoformat()}:{limit}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.labels("experiment_stats", "hit").inc()
+            data = json.loads(cached)
+            return ExperimentStats(
+                total=data["total"],
+                by_brand=[FacetCount(**item) for item in data["by_brand"]],
+                by_year=[FacetCount(**item) for item in data["by_year"]],
+                by_day=[DailyCount(day=date.fromisoformat(item["day"]), count=item["count"]) for item in data["by_day"]],
+            )
+
+        CACHE_LOOKUPS.labels("experiment_stats", "miss").inc()
+        stats = await self.repo.stats(since=since, limit=limit)
+        if time.time() - bumped_at >= self.settle_seconds:
+            await self.cache.set(key, json.dumps(asdict(stats), default=date.isoformat).encode(), ttl_seconds=self.ttl_seconds)
+        return stats
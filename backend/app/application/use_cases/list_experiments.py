@@ -1,12 +1,83 @@
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from ...core.metrics import CACHE_LOOKUPS
+from ...core.tracing import traced
 from ...domain.repositories.experiment_repository import ExperimentRepository
 from ...domain.entities.experiment import Experiment
-from typing import Sequence
+from ..services.cache import CacheBackend
+
+LIST_VERSION_KEY = "experiments:list:version"
+
+
+def new_list_version() -> bytes:
+    # The bump time lets readers avoid caching pages read from a lagging replica.
+    return f"{uuid4().hex}:{time.time()}".encode()
+
+
+async def current_list_version(cache: CacheBackend) -> tuple[str, float]:
+    """Return the version that keys cached experiment reads and when it was bumped."""
+    version = await cache.get(LIST_VERSION_KEY)
+    if version is None:
+        version = new_list_version()
+        await cache.set(LIST_VERSION_KEY, version)
+    tag, _, bumped_at = version.decode().partition(":")
+    return tag, float(bumped_at)
 
 
 class ListExperiments:
-    def __init__(self, repo: ExperimentRepository):
+    def __init__(
+        self,
+        repo: ExperimentRepository,
+        cache: Optional[CacheBackend] = None,
+        *,
+        ttl_seconds: float = 30,
+        settle_seconds: float = 0,
+    ):
         self.repo = repo
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+
+    @traced()
+    async def execute(
+        self,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year: Optional[str] = None,
+        q: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Sequence[Experiment]:
+        # Matching is case-insensitive and ignores surrounding whitespace.
+        filters = {
+            name: value.strip().lower() or None if value else None
+            for name, value in (("brand", brand), ("model", model), ("year", year), ("q", q))
+        }
+        filters["user_id"] = user_id
+        if self.cache is None:
+            return await self.repo.list(limit=limit, offset=offset, **filters)
 
-    async def execute(self, *, limit: int = 50, offset: int = 0) -> Sequence[Experiment]:
-        return await self.repo.list(limit=limit, offset=offset)
+        version, bumped_at = await current_list_version(self.cache)
+        filter_key = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:16]
+        key = f"experiments:list:{version}:{limit}:{offset}:{filter_key}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.labels("experiments_list", "hit").inc()
+            return [
+                Experiment(**{**item, "created_at": datetime.fromisoformat(item["created_at"])})
+                for item in json.loads(cached)
+            ]
 
+        CACHE_LOOKUPS.labels("experiments_list", "miss").inc()
+        items = await self.repo.list(limit=limit, offset=offset, **filters)
+        if time.time() - bumped_at >= self.settle_seconds:
+            payload = json.dumps([{**e.__dict__, "created_at": e.created_at.isoformat()} for e in items])
+            await self.cache.set(key, payload.encode(), ttl_seconds=self.ttl_seconds)
+        return items
@@ -1,28 +1,53 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
 
 from ..exceptions import InvalidCredentialsError, EmailNotVerifiedError
+from ..services.login_throttle import LoginThrottle
 from ..services.security import PasswordHasher, TokenService
+from ...core.metrics import PASSWORD_REHASHES
+from ...core.tracing import traced
 from ...domain.repositories.user_repository import UserRepository
 
 
 class LoginUser:
-    def __init__(self, repo: UserRepository, hasher: PasswordHasher, token_service: TokenService) -> None:
+    def __init__(
+        self,
+        repo: UserRepository,
+        hasher: PasswordHasher,
+        token_service: TokenService,
+        throttle: Optional[LoginThrottle] = None,
+    ) -> None:
         self.repo = repo
         self.hasher = hasher
         self.token_service = token_service
+        self.throttle = throttle
 
-    async def execute(self, *, email: str, password: str) -> dict[str, str]:
+    @traced()
+    async def execute(self, *, email: str, password: str, client_key: Optional[str] = None) -> dict[str, str]:
         normalized_email = email.strip().lower()
+        if self.throttle is not None:
+            # Before the lookup and bcrypt, so rejected attempts cost neither.
+            await self.throttle.hit(email=normalized_email, client_key=client_key)
         user = await self.repo.get_by_email(normalized_email)
         if user is None or user.provider != "local" or not user.password_hash:
             raise InvalidCredentialsError("Invalid credentials")
-        if not self.hasher.verify(password, user.password_hash):
+        # bcrypt takes hundreds of milliseconds, twice when rehashing; keep it off the loop.
+        verified, new_hash = await run_in_threadpool(self.hasher.verify_and_update, password, user.password_hash)
+        if not verified:
             raise InvalidCredentialsError("Invalid credentials")
+        if self.throttle is not None:
+            await self.throttle.reset(email=normalized_email, client_key=client_key)
         if not user.is_active:
             raise EmailNotVerifiedError("Email not verified")
 
+        if new_hash is not None:
+            # Rides along with the updated_at write below, so no extra round trip.
+            user.password_hash = new_hash
+            PASSWORD_REHASHES.inc()
         user.updated_at = datetime.utcnow()
         await self.repo.update(user)
 
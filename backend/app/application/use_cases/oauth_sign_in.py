@@ -7,6 +7,7 @@ from uuid import uuid4
 from ..services.security import TokenService
 from ...domain.entities.user import User
 from ...domain.repositories.user_repository import UserRepository
+from ...core.tracing import traced
 
 
 class OAuthSignIn:
@@ -14,6 +15,7 @@ class OAuthSignIn:
         self.repo = repo
         self.token_service = token_service
 
+    @traced()
     async def execute(
         self,
         *,
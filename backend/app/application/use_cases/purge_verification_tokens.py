@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+
+from ...core.metrics import TOKEN_PURGE_BATCH_SECONDS, TOKEN_PURGE_ROWS
+from ...core.tracing import traced
+from ...domain.repositories.user_repository import UserRepository
+
+
+class PurgeVerificationTokens:
+    """Deletes expired and consumed verification tokens in short, separately committed batches."""
+
+    def __init__(self, repo: UserRepository) -> None:
+        self.repo = repo
+
+    @traced()
+    async def execute(
+        self,
+        *,
+        batch_size: int,
+        max_batches: int,
+        retention: timedelta,
+        pause_seconds: float = 0,
+    ) -> int:
+        total = 0
+        for _ in range(max_batches):
+            start = time.perf_counter()
+            deleted = await self.repo.purge_verification_tokens(batch_size=batch_size, retention=retention)
+            TOKEN_PURGE_BATCH_SECONDS.observe(time.perf_counter() - start)
+            TOKEN_PURGE_ROWS.inc(deleted)
+            total += deleted
+            if deleted < batch_size:
+                break
+            # Give autovacuum and foreground queries room between batches.
+            await asyncio.sleep(pause_seconds)
+        return total
@@ -0,0 +1,18 @@
+from ...domain.entities.fingerprint import InputFingerprint
+from ...domain.repositories.fingerprint_repository import FingerprintRepository
+from ..services.image_hashing import FingerprintIndex
+from ...core.tracing import traced
+
+
+class RecordInputFingerprint:
+    def __init__(self, repo: FingerprintRepository, index: FingerprintIndex):
+        self.repo = repo
+        self.index = index
+
+    @traced()
+    async def execute(self, fingerprint: InputFingerprint) -> None:
+        # An experiment keeps its first fingerprint; a later one is not indexed either.
+        created_at = await self.repo.save(fingerprint)
+        if created_at is not None:
+            fingerprint.created_at = created_at
+            self.index.add(fingerprint)
@@ -7,6 +7,7 @@ from ..exceptions import DuplicateEmailError
 from ..services.security import PasswordHasher
 from ...domain.entities.user import User, EmailVerificationToken
 from ...domain.repositories.user_repository import UserRepository
+from ...core.tracing import traced
 
 
 class RegisterUser:
@@ -15,6 +16,7 @@ class RegisterUser:
         self.hasher = hasher
         self.verification_ttl = timedelta(hours=verification_ttl_hours)
 
+    @traced()
     async def execute(self, *, email: str, password: str, display_name: str | None) -> tuple[User, EmailVerificationToken]:
         normalized_email = email.strip().lower()
         existing = await self.repo.get_by_email(normalized_email)
@@ -0,0 +1,37 @@
+"""Measure bcrypt hash time on this machine and recommend a BCRYPT_ROUNDS value.
+
+    python -m app.cli.calibrate_bcrypt --target-ms 250
+
+Run it on each instance type; set BCRYPT_ROUNDS to the lowest recommendation so
+login cost stays within budget everywhere, or leave it unset to calibrate at start-up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from ..application.services.security import calibrate_bcrypt_rounds, measure_bcrypt_seconds
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli.calibrate_bcrypt", description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="hash time budget per login")
+    parser.add_argument("--min-rounds", type=int, default=12)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3, help="hashes timed per cost factor")
+    args = parser.parse_args(argv)
+
+    rounds = calibrate_bcrypt_rounds(
+        args.target_ms / 1000, min_rounds=args.min_rounds, max_rounds=args.max_rounds, samples=args.samples
+    )
+    for cost in range(max(4, rounds - 2), min(31, rounds + 1) + 1):
+        ms = measure_bcrypt_seconds(cost, samples=args.samples) * 1000
+        marker = "  <- recommended" if cost == rounds else ""
+        print(f"rounds={cost:<3} {ms:9.1f} ms{marker}")
+    print(f"BCRYPT_ROUNDS={rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,3 +1,4 @@
+import ipaddress
 import os
 from pathlib import Path
 
@@ -26,7 +27,94 @@ class Settings(BaseModel):
         "DATABASE_URL",
         "postgresql+asyncpg://nfw_user:nfw_pass@db:5432/nfw_db",
     )
+    db_read_url: str | None = os.getenv("DATABASE_READ_URL") or None
+    db_read_your_writes_seconds: float = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+    db_read_retry_seconds: float = float(os.getenv("DB_READ_RETRY_SECONDS", "30"))
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: str = os.getenv("DB_POOL_PRE_PING", "always")
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_url: str = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+    cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_max_entry_bytes: int = int(os.getenv("CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+    cache_shm_name: str = os.getenv("CACHE_SHM_NAME", "nfw-cache")
+    cache_shm_slot_bytes: int = int(os.getenv("CACHE_SHM_SLOT_BYTES", "16384"))
+    cache_local_max_bytes: int = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(8 * 1024 * 1024)))
+    cache_local_ttl_seconds: float = float(os.getenv("CACHE_LOCAL_TTL_SECONDS", "5"))
+    cache_command_timeout_seconds: float = float(os.getenv("CACHE_COMMAND_TIMEOUT_SECONDS", "0.5"))
+    # Listings, facets and stats are only cached where every worker sees the same entries:
+    # with the per-process memory backend a create in one worker would leave the others
+    # serving stale pages until the TTL ran out.
+    cache_listings: bool = _bool_from_env(
+        "CACHE_LISTINGS", os.getenv("CACHE_BACKEND", "memory").strip().lower() in {"shared", "redis"}
+    )
+    cache_list_ttl_seconds: float = float(os.getenv("CACHE_LIST_TTL_SECONDS", "30"))
+    cache_facets_ttl_seconds: float = float(os.getenv("CACHE_FACETS_TTL_SECONDS", "300"))
+    token_purge_enabled: bool = _bool_from_env("TOKEN_PURGE_ENABLED", True)
+    token_purge_interval_seconds: float = float(os.getenv("TOKEN_PURGE_INTERVAL_SECONDS", "3600"))
+    token_purge_batch_size: int = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", "1000"))
+    token_purge_max_batches: int = int(os.getenv("TOKEN_PURGE_MAX_BATCHES", "100"))
+    token_purge_pause_ms: float = float(os.getenv("TOKEN_PURGE_PAUSE_MS", "50"))
+    token_purge_retention_hours: float = float(os.getenv("TOKEN_PURGE_RETENTION_HOURS", "24"))
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    input_reuse_enabled: bool = _bool_from_env("INPUT_REUSE_ENABLED", True)
+    input_reuse_max_distance: int = int(os.getenv("INPUT_REUSE_MAX_DISTANCE", "6"))
+    input_reuse_refresh_seconds: float = float(os.getenv("INPUT_REUSE_REFRESH_SECONDS", "30"))
+    rendition_workers: int = int(os.getenv("RENDITION_WORKERS", "2"))
+    rendition_quality: int = int(os.getenv("RENDITION_QUALITY", "75"))
     google_api_key: str = os.getenv("api_key", "")
+    warm_imports: bool = _bool_from_env("WARM_IMPORTS", True)
+    warmup_enabled: bool = _bool_from_env("WARMUP_ENABLED", True)
+    warmup_timeout_seconds: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "20"))
+    warmup_db_connections: int = int(os.getenv("WARMUP_DB_CONNECTIONS", os.getenv("DB_POOL_SIZE", "5")))
+    generate_max_concurrency: int = int(os.getenv("GENERATE_MAX_CONCURRENCY", "8"))
+    generate_max_queue: int = int(os.getenv("GENERATE_MAX_QUEUE", "32"))
+    generate_queue_timeout_seconds: float = float(os.getenv("GENERATE_QUEUE_TIMEOUT_SECONDS", "15"))
+    generate_full_model: str = os.getenv("GENERATE_FULL_MODEL", "gemini-2.5-flash-image-preview")
+    generate_preview_model: str = os.getenv("GENERATE_PREVIEW_MODEL", "gemini-2.5-flash-image-preview")
+    generate_default_tier: str = os.getenv("GENERATE_DEFAULT_TIER", "full")
+    generate_preview_max_edge: int = int(os.getenv("GENERATE_PREVIEW_MAX_EDGE", "512"))
+    generate_preview_quality: int = int(os.getenv("GENERATE_PREVIEW_QUALITY", "80"))
+    # Kept uploads go to Redis when it is configured, so any worker can serve the full tier.
+    # Shared-memory slots are far smaller than a photo, so that backend keeps them per worker.
+    generate_inputs_store: str = os.getenv(
+        "GENERATE_INPUTS_STORE", "cache" if os.getenv("CACHE_BACKEND", "memory").strip().lower() == "redis" else "memory"
+    )
+    generate_inputs_max_bytes: int = int(os.getenv("GENERATE_INPUTS_MAX_BYTES", str(256 * 1024 * 1024)))
+    generate_inputs_ttl_seconds: float = float(os.getenv("GENERATE_INPUTS_TTL_SECONDS", "1800"))
+    generate_inputs_timeout_seconds: float = float(os.getenv("GENERATE_INPUTS_TIMEOUT_SECONDS", "5"))
+    generate_batch_max_variants: int = int(os.getenv("GENERATE_BATCH_MAX_VARIANTS", "8"))
+    generate_batch_concurrency: int = int(os.getenv("GENERATE_BATCH_CONCURRENCY", "4"))
+    generate_deadline_seconds: float = float(os.getenv("GENERATE_DEADLINE_SECONDS", "90"))
+    generate_max_attempts: int = int(os.getenv("GENERATE_MAX_ATTEMPTS", "3"))
+    generate_retry_base_seconds: float = float(os.getenv("GENERATE_RETRY_BASE_SECONDS", "0.5"))
+    generate_retry_max_seconds: float = float(os.getenv("GENERATE_RETRY_MAX_SECONDS", "8"))
+    generate_hedge_enabled: bool = _bool_from_env("GENERATE_HEDGE_ENABLED", False)
+    generate_hedge_quantile: float = float(os.getenv("GENERATE_HEDGE_QUANTILE", "0.95"))
+    generate_hedge_min_samples: int = int(os.getenv("GENERATE_HEDGE_MIN_SAMPLES", "20"))
+    generate_model_workers: int = int(os.getenv("GENERATE_MODEL_WORKERS", "16"))
+    generate_circuit_failure_rate: float = float(os.getenv("GENERATE_CIRCUIT_FAILURE_RATE", "0.5"))
+    generate_circuit_min_calls: int = int(os.getenv("GENERATE_CIRCUIT_MIN_CALLS", "10"))
+    generate_circuit_window_seconds: float = float(os.getenv("GENERATE_CIRCUIT_WINDOW_SECONDS", "60"))
+    generate_circuit_open_seconds: float = float(os.getenv("GENERATE_CIRCUIT_OPEN_SECONDS", "30"))
+    generate_rate_per_minute: float = float(os.getenv("GENERATE_RATE_PER_MINUTE", "6"))
+    generate_rate_burst: int = int(os.getenv("GENERATE_RATE_BURST", "3"))
+    login_throttle_enabled: bool = _bool_from_env("LOGIN_THROTTLE_ENABLED", True)
+    login_throttle_store: str = os.getenv("LOGIN_THROTTLE_STORE", "memory")
+    login_throttle_max_bytes: int = int(os.getenv("LOGIN_THROTTLE_MAX_BYTES", str(16 * 1024 * 1024)))
+    login_throttle_window_seconds: float = float(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "900"))
+    login_throttle_email_limit: int = int(os.getenv("LOGIN_THROTTLE_EMAIL_LIMIT", "10"))
+    login_throttle_ip_limit: int = int(os.getenv("LOGIN_THROTTLE_IP_LIMIT", "100"))
+    login_lockout_base_seconds: float = float(os.getenv("LOGIN_LOCKOUT_BASE_SECONDS", "60"))
+    login_lockout_max_seconds: float = float(os.getenv("LOGIN_LOCKOUT_MAX_SECONDS", "3600"))
+    # Unset: pick the cost at start-up so one hash takes about BCRYPT_TARGET_MS here.
+    bcrypt_rounds: int | None = int(os.getenv("BCRYPT_ROUNDS")) if os.getenv("BCRYPT_ROUNDS") else None
+    bcrypt_target_ms: float = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+    bcrypt_min_rounds: int = int(os.getenv("BCRYPT_MIN_ROUNDS", "12"))
+    bcrypt_max_rounds: int = int(os.getenv("BCRYPT_MAX_ROUNDS", "16"))
     jwt_secret: str = os.getenv("JWT_SECRET", "change-me")
     jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
     jwt_access_token_exp_minutes: int = int(os.getenv("JWT_ACCESS_TOKEN_EXP_MINUTES", "60"))
@@ -37,6 +125,29 @@ class Settings(BaseModel):
         for origin in os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:3000").split(",")
         if origin.strip()
     ]
+    # Peers allowed to tell us the client address through X-Forwarded-For.
+    trusted_proxies: list[str] = [
+        network.strip()
+        for network in os.getenv("TRUSTED_PROXIES", "127.0.0.1/32,::1/128").split(",")
+        if network.strip()
+    ]
+    health_check_interval_seconds: float = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+    health_check_timeout_seconds: float = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "3"))
+    health_required_checks: list[str] = [
+        name.strip() for name in os.getenv("HEALTH_REQUIRED_CHECKS", "db").split(",") if name.strip()
+    ]
+    tracing_enabled: bool = _bool_from_env("TRACING_ENABLED", False)
+    tracing_exporter: str = os.getenv("TRACING_EXPORTER", "otlp")
+    tracing_otlp_endpoint: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    tracing_file_path: str = os.getenv("TRACING_FILE_PATH", "/tmp/nfw-traces.jsonl")
+    tracing_sample_rate: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.05"))
+    tracing_service_name: str = os.getenv("TRACING_SERVICE_NAME", "need-for-wheels-api")
+    profiling_enabled: bool = _bool_from_env("PROFILING_ENABLED", False)
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    profiling_admin_token: str | None = os.getenv("PROFILING_ADMIN_TOKEN") or None
+    profiling_interval_ms: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    profiling_dir: str = os.getenv("PROFILING_DIR", "/tmp/nfw-profiles")
+    profiling_max_profiles: int = int(os.getenv("PROFILING_MAX_PROFILES", "200"))
     smtp_host: str | None = os.getenv("SMTP_HOST")
     smtp_port: int = int(os.getenv("SMTP_PORT", "587"))
     smtp_username: str | None = os.getenv("SMTP_USERNAME")
@@ -46,6 +157,71 @@ class Settings(BaseModel):
     smtp_from_email: str | None = os.getenv("SMTP_FROM_EMAIL")
     smtp_reply_to: str | None = os.getenv("SMTP_REPLY_TO")
 
+    @field_validator("db_pool_pre_ping")
+    @classmethod
+    def ensure_pre_ping_strategy(cls, v: str) -> str:
+        strategy = v.strip().lower()
+        if strategy not in {"always", "never"}:
+            raise ValueError("DB_POOL_PRE_PING must be 'always' or 'never'")
+        return strategy
+
+    @field_validator("bcrypt_rounds", "bcrypt_min_rounds", "bcrypt_max_rounds")
+    @classmethod
+    def ensure_bcrypt_cost(cls, v: int | None) -> int | None:
+        if v is not None and not 4 <= v <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31")
+        return v
+
+    @field_validator("cache_backend")
+    @classmethod
+    def ensure_cache_backend(cls, v: str) -> str:
+        backend = v.strip().lower()
+        if backend not in {"memory", "shared", "redis"}:
+            raise ValueError("CACHE_BACKEND must be 'memory', 'shared' or 'redis'")
+        return backend
+
+    @field_validator("generate_default_tier")
+    @classmethod
+    def ensure_generate_tier(cls, v: str) -> str:
+        tier = v.strip().lower()
+        if tier not in {"preview", "full"}:
+            raise ValueError("GENERATE_DEFAULT_TIER must be 'preview' or 'full'")
+        return tier
+
+    @field_validator("generate_inputs_store")
+    @classmethod
+    def ensure_generate_inputs_store(cls, v: str) -> str:
+        store = v.strip().lower()
+        if store not in {"memory", "cache"}:
+            raise ValueError("GENERATE_INPUTS_STORE must be 'memory' or 'cache'")
+        return store
+
+    @field_validator("tracing_exporter")
+    @classmethod
+    def ensure_tracing_exporter(cls, v: str) -> str:
+        exporter = v.strip().lower()
+        if exporter not in {"otlp", "file"}:
+            raise ValueError("TRACING_EXPORTER must be 'otlp' or 'file'")
+        return exporter
+
+    @field_validator("login_throttle_store")
+    @classmethod
+    def ensure_login_throttle_store(cls, v: str) -> str:
+        store = v.strip().lower()
+        if store not in {"memory", "cache"}:
+            raise ValueError("LOGIN_THROTTLE_STORE must be 'memory' or 'cache'")
+        return store
+
+    @field_validator("trusted_proxies")
+    @classmethod
+    def ensure_trusted_proxies(cls, v: list[str]) -> list[str]:
+        for network in v:
+            try:
+                ipaddress.ip_network(network, strict=False)
+            except ValueError as exc:
+                raise ValueError(f"TRUSTED_PROXIES entry {network!r} is not an address or network") from exc
+        return v
+
     @field_validator("cors_origins", mode="before")
     @classmethod
     def ensure_list(cls, v):
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+MIXED_BUCKETS = FAST_BUCKETS + (10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = (16_384, 65_536, 262_144, 1_048_576, 2_097_152, 4_194_304, 8_388_608, 16_777_216)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "nfw_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=MIXED_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "nfw_http_requests_in_flight",
+    "HTTP requests currently being handled by route",
+    ["method", "route"],
+)
+IMAGE_GENERATION_SECONDS = Histogram(
+    "nfw_image_generation_duration_seconds",
+    "Image model call latency",
+    ["model", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+IMAGE_GENERATION_BYTES = Histogram(
+    "nfw_image_generation_payload_bytes",
+    "Bytes sent to and received from the image model",
+    ["direction"],
+    buckets=BYTES_BUCKETS,
+)
+MODEL_CALL_ATTEMPTS = Counter(
+    "nfw_model_call_attempts_total",
+    "Image model call attempts, including retries and hedges",
+    ["outcome"],
+)
+MODEL_HEDGES = Counter(
+    "nfw_model_hedges_total",
+    "Hedged image model requests launched and won",
+    ["result"],
+)
+CIRCUIT_STATE = Gauge(
+    "nfw_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["circuit"],
+)
+CIRCUIT_REJECTIONS = Counter(
+    "nfw_circuit_rejections_total",
+    "Calls rejected without being attempted because a circuit was open",
+    ["circuit"],
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "nfw_password_hash_duration_seconds",
+    "bcrypt hash and verify durations",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+BCRYPT_ROUNDS = Gauge(
+    "nfw_bcrypt_rounds",
+    "bcrypt cost factor used for new password hashes",
+)
+PASSWORD_REHASHES = Counter(
+    "nfw_password_rehashes_total",
+    "Stored password hashes upgraded on login because their cost was out of policy",
+)
+LOGIN_THROTTLED = Counter(
+    "nfw_login_throttled_total",
+    "Login attempts rejected before any credential check",
+    ["scope"],
+)
+LOGIN_LOCKOUTS = Counter(
+    "nfw_login_lockouts_total",
+    "Login lockouts started",
+    ["scope"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "nfw_db_query_duration_seconds",
+    "SQL latency per repository method",
+    ["repository", "method"],
+    buckets=FAST_BUCKETS,
+)
+SMTP_SEND_SECONDS = Histogram(
+    "nfw_smtp_send_duration_seconds",
+    "SMTP delivery time",
+    ["outcome"],
+    buckets=SLOW_BUCKETS,
+)
+OAUTH_PROVIDER_SECONDS = Histogram(
+    "nfw_oauth_provider_duration_seconds",
+    "Outbound OAuth provider call latency",
+    ["provider", "operation"],
+    buckets=MIXED_BUCKETS,
+)
+DEPENDENCY_UP = Gauge(
+    "nfw_dependency_up",
+    "Whether the last background check of a dependency succeeded",
+    ["check"],
+)
+DEPENDENCY_CHECK_SECONDS = Gauge(
+    "nfw_dependency_check_duration_seconds",
+    "Latency of the last background check of a dependency",
+    ["check"],
+)
+WARMUP_STEP_SECONDS = Gauge(
+    "nfw_warmup_step_duration_seconds",
+    "Time the last start-up warm-up step took",
+    ["step"],
+)
+WARMUP_STEP_OK = Gauge(
+    "nfw_warmup_step_ok",
+    "Whether the last start-up warm-up step succeeded",
+    ["step"],
+)
+JWKS_CACHE_LOOKUPS = Counter(
+    "nfw_jwks_cache_lookups_total",
+    "Signing key cache lookups",
+    ["provider", "result"],
+)
+RENDITION_SECONDS = Histogram(
+    "nfw_rendition_seconds",
+    "Time to encode all renditions of one generated image",
+    ["outcome"],
+    buckets=MIXED_BUCKETS,
+)
+RENDITION_BYTES = Histogram(
+    "nfw_rendition_bytes",
+    "Encoded rendition size",
+    ["size", "format"],
+    buckets=BYTES_BUCKETS,
+)
+EXPORT_ROWS = Counter(
+    "nfw_export_rows_total",
+    "Experiments streamed by the bulk export",
+    ["format"],
+)
+CACHE_LOOKUPS = Counter(
+    "nfw_cache_lookups_total",
+    "Shared cache lookups",
+    ["cache", "result"],
+)
+TOKEN_PURGE_ROWS = Counter(
+    "nfw_verification_token_purge_rows_total",
+    "Verification tokens deleted by the purge job",
+)
+TOKEN_PURGE_BATCH_SECONDS = Histogram(
+    "nfw_verification_token_purge_batch_seconds",
+    "Latency of one verification token purge batch",
+    buckets=FAST_BUCKETS,
+)
+TOKEN_PURGE_RUNS = Counter(
+    "nfw_verification_token_purge_runs_total",
+    "Verification token purge runs",
+    ["outcome"],
+)
+TRACE_SPANS = Counter(
+    "nfw_trace_spans_total",
+    "Finished trace spans by export result",
+    ["result"],
+)
+
+
+def timed(histogram: Histogram, **labels: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate a coroutine function so its duration is observed on ``histogram``.
+
+    The call is also traced as a span named after the label values, e.g. ``user.get_by_email``.
+    """
+
+    from .tracing import span
+
+    child = histogram.labels(**labels) if labels else histogram
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        span_name = ".".join(labels.values()) or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            start = time.perf_counter()
+            try:
+                with span(span_name, kind="client", **labels):
+                    return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
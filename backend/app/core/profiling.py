@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame: Optional[FrameType], root: Optional[FrameType]) -> str:
+    # Stop at the task's outermost coroutine so running and awaiting stacks share roots.
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        if frame is root:
+            break
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def _awaiting_stack(task: asyncio.Task) -> str:
+    labels: list[str] = []
+    coro: Any = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    labels.append("[awaiting]")
+    return ";".join(labels)
+
+
+class RequestProfile:
+    """Folded call stacks sampled while one asyncio task was in flight."""
+
+    __slots__ = ("task", "wall", "cpu", "started_at", "wall_seconds", "interval_seconds")
+
+    def __init__(self, task: asyncio.Task, interval_seconds: float) -> None:
+        self.task = task
+        self.wall: Counter[str] = Counter()
+        self.cpu: Counter[str] = Counter()
+        self.started_at = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.interval_seconds = interval_seconds
+
+    @property
+    def cpu_seconds(self) -> float:
+        # Samples where the task itself held the event loop thread.
+        return sum(self.cpu.values()) * self.interval_seconds
+
+
+class TaskSampler:
+    """Samples the stacks of selected asyncio tasks from a background thread.
+
+    When a profiled task is running on the loop thread its live stack counts towards
+    both wall and CPU profiles; while suspended, its await chain counts towards wall
+    time only. The thread sleeps on an event while nothing is being profiled.
+    """
+
+    def __init__(self, *, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._active: dict[int, RequestProfile] = {}
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self) -> RequestProfile:
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("TaskSampler.start() must be called from a running task")
+        profile = RequestProfile(task, self.interval_seconds)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self._active[id(profile)] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return profile
+
+    def stop(self, profile: RequestProfile) -> RequestProfile:
+        with self._lock:
+            self._active.pop(id(profile), None)
+            if not self._active:
+                self._wake.clear()
+        profile.wall_seconds = time.perf_counter() - profile.started_at
+        return profile
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval_seconds)
+            with self._lock:
+                profiles = list(self._active.values())
+                loop = self._loop
+                thread_id = self._loop_thread_id
+            if not profiles or loop is None or thread_id is None:
+                continue
+            try:
+                running = asyncio.current_task(loop)
+                frame = sys._current_frames().get(thread_id)
+                running_stack = (
+                    _thread_stack(frame, getattr(running.get_coro(), "cr_frame", None))
+                    if running is not None
+                    else None
+                )
+                for profile in profiles:
+                    if profile.task is running and running_stack is not None:
+                        profile.wall[running_stack] += 1
+                        profile.cpu[running_stack] += 1
+                    else:
+                        profile.wall[_awaiting_stack(profile.task)] += 1
+            except Exception:  # pragma: no cover - frames can change underneath the sampler
+                continue
+
+
+class ProfileRing:
+    """Bounded on-disk store of request profiles in folded-stack format.
+
+    Each profile is a directory holding ``wall.folded`` and ``cpu.folded`` (readable by
+    flamegraph.pl, speedscope and inferno) plus ``meta.json``. The oldest profiles are
+    removed once ``max_profiles`` is exceeded.
+    """
+
+    def __init__(self, directory: str, *, max_profiles: int) -> None:
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def write(self, name: str, profile: RequestProfile, meta: dict[str, Any]) -> Path:
+        target = self.directory / f"{time.time_ns()}-{name}"
+        target.mkdir(parents=True, exist_ok=True)
+        for kind, stacks in (("wall", profile.wall), ("cpu", profile.cpu)):
+            with open(target / f"{kind}.folded", "w", encoding="utf-8") as fh:
+                for stack, count in stacks.most_common():
+                    fh.write(f"{stack} {count}\n")
+        meta = {
+            **meta,
+            "wall_seconds": round(profile.wall_seconds, 6),
+            "cpu_seconds": round(profile.cpu_seconds, 6),
+            "interval_seconds": profile.interval_seconds,
+            "samples": sum(profile.wall.values()),
+        }
+        (target / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._prune()
+        return target
+
+    def _prune(self) -> None:
+        entries = sorted(p for p in self.directory.iterdir() if p.is_dir())
+        for stale in entries[: max(0, len(entries) - self.max_profiles)]:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,408 @@
+"""Lightweight tracing: spans in a context variable, exported as OTLP/JSON or JSON lines.
+
+Sampling is decided once per trace, at its root span (or taken from an incoming
+``traceparent``), so an unsampled request costs one context-variable lookup per
+instrumented call. Finished spans are queued and exported from a background thread.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Protocol, TypeVar
+
+from .metrics import TRACE_SPANS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+@dataclass(frozen=True, slots=True)
+class _Unsampled:
+    """Marks a trace that was not sampled, so its descendants skip work too."""
+
+
+_UNSAMPLED = _Unsampled()
+_current: contextvars.ContextVar[Span | _Unsampled | None] = contextvars.ContextVar("nfw_span", default=None)
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": KINDS[span.kind],
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error is not None else {"code": 0},
+    }
+    if span.parent_id is not None:
+        out["parentSpanId"] = span.parent_id
+    return out
+
+
+class OtlpHttpExporter:
+    """Posts batches to an OTLP/HTTP collector endpoint using the JSON encoding."""
+
+    def __init__(self, endpoint: str, *, service_name: str, timeout_seconds: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+        self.timeout_seconds = timeout_seconds
+        self._client: Any = None
+
+    def export(self, spans: list[Span]) -> None:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.Client(timeout=self.timeout_seconds)
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": self.resource,
+                    "scopeSpans": [{"scope": {"name": "nfw"}, "spans": [_otlp_span(s) for s in spans]}],
+                }
+            ]
+        }
+        resp = self._client.post(self.endpoint, json=body)
+        resp.raise_for_status()
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+
+
+class FileSpanExporter:
+    """Appends one JSON object per span to ``path``, for local runs without a collector."""
+
+    def __init__(self, path: str, *, service_name: str) -> None:
+        self.path = path
+        self.service_name = service_name
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, spans: list[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for span in spans:
+                record = _otlp_span(span)
+                record["service"] = self.service_name
+                record["durationMs"] = round((span.end_ns - span.start_ns) / 1e6, 3)
+                fh.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    """Buffers finished spans and exports them from a daemon thread.
+
+    The buffer is bounded; when the exporter falls behind, new spans are dropped
+    rather than blocking request handling.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        *,
+        max_queue: int = 4096,
+        batch_size: int = 512,
+        flush_interval_seconds: float = 5.0,
+    ) -> None:
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: deque[Span] = deque()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            TRACE_SPANS.labels("dropped").inc()
+            return
+        self._queue.append(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None and not self._stopped:
+                    self._thread = threading.Thread(target=self._run, name="span-export", daemon=True)
+                    self._thread.start()
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def _export_pending(self) -> None:
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                self.exporter.export(batch)
+                TRACE_SPANS.labels("exported").inc(len(batch))
+            except Exception as exc:
+                TRACE_SPANS.labels("failed").inc(len(batch))
+                logger.warning("Span export failed: %s", exc)
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            self._export_pending()
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval_seconds)
+        self._export_pending()
+        self.exporter.close()
+
+
+class Tracer:
+    def __init__(self, processor: BatchSpanProcessor, *, sample_rate: float) -> None:
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(
+    *,
+    exporter: str,
+    service_name: str,
+    sample_rate: float,
+    otlp_endpoint: str,
+    file_path: str,
+    batch_size: int = 512,
+    flush_interval_seconds: float = 5.0,
+) -> Tracer:
+    global _tracer
+    if exporter == "file":
+        span_exporter: SpanExporter = FileSpanExporter(file_path, service_name=service_name)
+    else:
+        span_exporter = OtlpHttpExporter(otlp_endpoint, service_name=service_name)
+    processor = BatchSpanProcessor(span_exporter, batch_size=batch_size, flush_interval_seconds=flush_interval_seconds)
+    _tracer = Tracer(processor, sample_rate=sample_rate)
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.processor.shutdown()
+        _tracer = None
+
+
+def parse_traceparent(header: Optional[str]) -> Span | _Unsampled | None:
+    """Turn a W3C ``traceparent`` header into a remote parent, honouring its sampled flag."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if not sampled:
+        return _UNSAMPLED
+    return Span(name="remote", trace_id=parts[1], span_id=parts[2], parent_id=None)
+
+
+def current_span() -> Optional[Span]:
+    span = _current.get()
+    return span if isinstance(span, Span) else None
+
+
+@contextmanager
+def span(
+    name: str,
+    *,
+    kind: str = "internal",
+    parent: Span | _Unsampled | None = None,
+    **attributes: Any,
+) -> Iterator[Optional[Span]]:
+    """Record ``name`` as a child of the current span, or start a trace if there is none.
+
+    Yields ``None`` when tracing is off or the trace is not sampled.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    parent = parent if parent is not None else _current.get()
+    if parent is _UNSAMPLED or (parent is None and random.random() >= tracer.sample_rate):
+        token = _current.set(_UNSAMPLED)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent is not None else None,
+        kind=kind,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        tracer.processor.on_end(current)
+
+
+def traced(name: Optional[str] = None, *, kind: str = "internal") -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Wrap a function, coroutine function or async generator function in a span.
+
+    An async generator's parent is taken when it is created, not when it is first
+    iterated, so a generator handed to a streaming response stays in the request's
+    trace. Its span covers the whole iteration and is current while it runs.
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or func.__qualname__
+
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            def agen_wrapper(*args: Any, **kwargs: Any):
+                return _iterate_in_span(span_name, kind, _current.get(), func(*args, **kwargs))
+
+            return agen_wrapper  # type: ignore[return-value]
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any):
+                with span(span_name, kind=kind):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any):
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def _iterate_in_span(name: str, kind: str, parent: Any, agen: Any):
+    tracer = _tracer
+    if tracer is None or parent is _UNSAMPLED or (parent is None and random.random() >= tracer.sample_rate):
+        try:
+            async for item in agen:
+                yield item
+        finally:
+            # A consumer that stops early closes us; pass that on rather than leave it to the GC.
+            await agen.aclose()
+        return
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent is not None else None,
+        kind=kind,
+        start_ns=time.time_ns(),
+    )
+    items = 0
+    try:
+        while True:
+            # Set and reset around each step: the consumer may resume us from another task.
+            token = _current.set(current)
+            try:
+                item = await agen.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                _current.reset(token)
+            items += 1
+            yield item
+    except GeneratorExit:
+        # The consumer stopped early; that is not an error of this span.
+        raise
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        # Run the wrapped generator's cleanup now and inside the span.
+        token = _current.set(current)
+        try:
+            await agen.aclose()
+        finally:
+            _current.reset(token)
+        current.end_ns = time.time_ns()
+        current.attributes["items"] = items
+        tracer.processor.on_end(current)
+
+
+def bind_context(func: Callable[..., T]) -> Callable[..., T]:
+    """Carry the caller's context (and so its current span) into an executor thread.
+
+    ``loop.run_in_executor`` does not copy context variables the way
+    ``asyncio.to_thread`` does.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
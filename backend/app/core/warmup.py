@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from .metrics import WARMUP_STEP_OK, WARMUP_STEP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the services that need them; preloaded off the request path after start-up.
+HEAVY_MODULES: tuple[str, ...] = (
+    "passlib.context",
+    "jwt",
+    "httpx",
+    "google.auth.transport.requests",
+    "google.oauth2.id_token",
+    "google.genai",
+)
+
+
+async def warm_imports(modules: Iterable[str] = HEAVY_MODULES) -> None:
+    for name in modules:
+        try:
+            await asyncio.to_thread(importlib.import_module, name)
+        except ImportError:  # pragma: no cover - optional at runtime, reported on first use
+            logger.warning("Background import of %s failed", name, exc_info=True)
+
+
+WarmUpStep = Callable[[], Awaitable[object]]
+
+
+async def run_warmup(steps: dict[str, WarmUpStep], *, timeout_seconds: float) -> dict[str, Optional[str]]:
+    """Run start-up warm-up steps concurrently and return each step's error, or ``None``.
+
+    A step that fails or overruns ``timeout_seconds`` is logged and skipped; the first
+    request then pays for it instead, as it would without warm-up.
+    """
+
+    async def run(name: str, step: WarmUpStep) -> tuple[str, Optional[str]]:
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            await asyncio.wait_for(step(), timeout=timeout_seconds)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            logger.warning("Warm-up step %s failed: %s", name, error)
+        elapsed = time.perf_counter() - start
+        WARMUP_STEP_SECONDS.labels(name).set(elapsed)
+        WARMUP_STEP_OK.labels(name).set(1 if error is None else 0)
+        return name, error
+
+    start = time.perf_counter()
+    results = dict(await asyncio.gather(*(run(name, step) for name, step in steps.items())))
+    logger.info(
+        "Warm-up finished in %.0f ms (%d/%d steps ok)",
+        (time.perf_counter() - start) * 1000,
+        sum(error is None for error in results.values()),
+        len(results),
+    )
+    return results
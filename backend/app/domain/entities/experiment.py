@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 
@@ -10,4 +10,25 @@ class Experiment:
     model: Optional[str]
     year: Optional[str]
     created_at: datetime
+    user_id: Optional[str] = None
 
+
+@dataclass
+class FacetCount:
+    value: str
+    label: str
+    count: int
+
+
+@dataclass
+class DailyCount:
+    day: date
+    count: int
+
+
+@dataclass
+class ExperimentStats:
+    total: int
+    by_brand: list[FacetCount]
+    by_year: list[FacetCount]
+    by_day: list[DailyCount]
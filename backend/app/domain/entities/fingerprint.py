@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(slots=True)
+class InputFingerprint:
+    """64-bit perceptual hashes of a generation's photos plus a digest of its prompt."""
+
+    experiment_id: Optional[str]
+    prompt_digest: str
+    car_hashes: tuple[int, ...]
+    wheel_hash: Optional[int]
+    created_at: datetime
+    # Owner of the experiment, None when it is anonymous; only set on stored fingerprints.
+    user_id: Optional[str] = None
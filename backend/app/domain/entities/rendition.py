@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class ExperimentRendition:
+    experiment_id: str
+    size: str
+    format: str
+    width: int
+    height: int
+    data: bytes
+    created_at: datetime
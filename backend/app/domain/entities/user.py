@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
 
@@ -24,3 +25,10 @@ class EmailVerificationToken:
     expires_at: datetime
     consumed_at: Optional[datetime]
     created_at: datetime
+
+
+class VerificationOutcome(str, Enum):
+    VERIFIED = "verified"
+    INVALID = "invalid"
+    EXPIRED = "expired"
+    USED = "used"
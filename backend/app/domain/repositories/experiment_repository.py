@@ -1,9 +1,31 @@
-from typing import Protocol, Sequence
-from ..entities.experiment import Experiment
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import AsyncIterator, Optional, Protocol, Sequence
+from ..entities.experiment import Experiment, ExperimentStats, FacetCount
 
 
 class ExperimentRepository(Protocol):
     async def create(self, exp: Experiment) -> None: ...
-    async def list(self, limit: int = 50, offset: int = 0) -> Sequence[Experiment]: ...
+    async def get(self, exp_id: str) -> Optional[Experiment]: ...
+    async def list(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        *,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year: Optional[str] = None,
+        q: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Sequence[Experiment]: ...
     async def delete(self, exp_id: str) -> None: ...
-
+    async def facet_counts(self, *, limit: int) -> dict[str, list[FacetCount]]: ...
+    async def stats(self, *, since: date, limit: int) -> ExperimentStats: ...
+    def stream(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        since_id: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Experiment]]: ...
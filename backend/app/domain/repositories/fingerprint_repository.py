@@ -0,0 +1,9 @@
+from datetime import datetime
+from typing import Optional, Protocol, Sequence
+from ..entities.fingerprint import InputFingerprint
+
+
+class FingerprintRepository(Protocol):
+    async def save(self, fingerprint: InputFingerprint) -> Optional[datetime]: ...
+
+    async def list_since(self, since: Optional[datetime]) -> Sequence[InputFingerprint]: ...
@@ -0,0 +1,10 @@
+from typing import Optional, Protocol, Sequence
+from ..entities.rendition import ExperimentRendition
+
+
+class RenditionRepository(Protocol):
+    async def save_many(self, renditions: Sequence[ExperimentRendition]) -> None: ...
+
+    async def get(
+        self, experiment_id: str, *, size: str, formats: Sequence[str]
+    ) -> Optional[ExperimentRendition]: ...
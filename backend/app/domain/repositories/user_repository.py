@@ -1,5 +1,6 @@
+from datetime import timedelta
 from typing import Protocol, Optional
-from ..entities.user import User, EmailVerificationToken
+from ..entities.user import User, EmailVerificationToken, VerificationOutcome
 
 
 class UserRepository(Protocol):
@@ -24,3 +25,11 @@ class UserRepository(Protocol):
     ) -> Optional[EmailVerificationToken]: ...
 
     async def mark_token_consumed(self, token: str) -> None: ...
+
+    async def consume_verification_token(
+        self, token: str
+    ) -> tuple[VerificationOutcome, Optional[User]]: ...
+
+    async def purge_verification_tokens(
+        self, *, batch_size: int, retention: timedelta
+    ) -> int: ...
@@ -0,0 +1,30 @@
+from functools import lru_cache
+
+from ...application.services.cache import CacheBackend
+from ...core.config import settings
+from .memory import MemoryCache
+from .redis import RedisCache
+from .shared_memory import SharedMemoryCache
+
+
+def create_cache() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        return RedisCache(
+            settings.cache_url,
+            max_entry_bytes=settings.cache_max_entry_bytes,
+            local_max_bytes=settings.cache_local_max_bytes,
+            local_ttl_seconds=settings.cache_local_ttl_seconds,
+            command_timeout_seconds=settings.cache_command_timeout_seconds,
+        )
+    if settings.cache_backend == "shared":
+        return SharedMemoryCache(
+            name=settings.cache_shm_name,
+            max_bytes=settings.cache_max_bytes,
+            slot_bytes=settings.cache_shm_slot_bytes,
+        )
+    return MemoryCache(max_bytes=settings.cache_max_bytes, max_entry_bytes=settings.cache_max_entry_bytes)
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> CacheBackend:
+    return create_cache()
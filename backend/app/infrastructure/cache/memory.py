@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by total bytes, with per-entry TTLs.
+
+    Entries are private to the worker, so this backend suits single-process
+    deployments and serves as the near cache in front of :class:`RedisCache`.
+    """
+
+    def __init__(self, *, max_bytes: int, max_entry_bytes: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self.size_bytes = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def get_nowait(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at and expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set_nowait(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None:
+        self._drop(key)
+        if len(value) > self.max_entry_bytes:
+            return
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else 0.0
+        self._entries[key] = (expires_at, value)
+        self.size_bytes += len(value)
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[1])
+
+    def invalidate_local(self, key: str) -> None:
+        self._drop(key)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None:
+        self.set_nowait(key, value, ttl_seconds=ttl_seconds)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    async def close(self) -> None:
+        self.clear()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+from .memory import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    """Error reply returned by a Redis-protocol server."""
+
+
+def _encode(*args: Any) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by cache server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        return RespError(rest.decode(errors="replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+
+class _Connection:
+    """One pipelined RESP connection: replies resolve pending futures in send order."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: deque[asyncio.Future] = deque()
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self.reader_task.done()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                reply = await _read_reply(self.reader)
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, IndexError) as exc:
+            error = exc if isinstance(exc, ConnectionError) else ConnectionError(str(exc))
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self.writer.close()
+
+    async def execute(self, *args: Any) -> Any:
+        if self.closed:
+            raise ConnectionError("Cache connection is closed")
+        future = asyncio.get_running_loop().create_future()
+        # write() and append() must not be separated by an await to keep replies ordered.
+        self.writer.write(_encode(*args))
+        self.pending.append(future)
+        await self.writer.drain()
+        reply = await future
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def close(self) -> None:
+        self.reader_task.cancel()
+        try:
+            await self.reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class RedisCache:
+    """Cache backed by any Redis-protocol server, with an optional per-worker near cache.
+
+    Commands share one pipelined connection. Every ``set``/``delete`` is published on
+    ``channel``; a subscriber task in each worker drops its near-cache copy when it
+    sees the key, so workers serve at most ``local_ttl_seconds``-old data only when
+    the subscription is down. Connection failures and commands slower than
+    ``command_timeout_seconds`` are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        max_entry_bytes: int,
+        local_max_bytes: int = 0,
+        local_ttl_seconds: float = 5.0,
+        channel: str = "nfw:cache:invalidate",
+        connect_timeout_seconds: float = 1.0,
+        command_timeout_seconds: float = 0.5,
+    ) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.max_entry_bytes = max_entry_bytes
+        self.local_ttl_seconds = local_ttl_seconds
+        self.local = MemoryCache(max_bytes=local_max_bytes) if local_max_bytes else None
+        self.channel = channel
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.command_timeout_seconds = command_timeout_seconds
+        self._conn: Optional[_Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._subscriber: Optional[asyncio.Task] = None
+
+    async def _open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.connect_timeout_seconds
+        )
+        for command in ((("AUTH", self.password),) if self.password else ()) + ((("SELECT", self.db),) if self.db else ()):
+            writer.write(_encode(*command))
+            await writer.drain()
+            reply = await _read_reply(reader)
+            if isinstance(reply, RespError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def _connection(self) -> _Connection:
+        if self._conn is not None and not self._conn.closed:
+            return self._conn
+        async with self._connect_lock:
+            if self._conn is None or self._conn.closed:
+                self._conn = _Connection(*await self._open())
+                if self.local is not None and (self._subscriber is None or self._subscriber.done()):
+                    self._subscriber = asyncio.create_task(self._subscribe())
+        return self._conn
+
+    async def _execute(self, *args: Any) -> Any:
+        conn = await self._connection()
+        # A timed-out command leaves its reply future cancelled; the read loop skips it.
+        try:
+            return await asyncio.wait_for(conn.execute(*args), self.command_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"{args[0]} timed out after {self.command_timeout_seconds}s") from None
+
+    async def _subscribe(self) -> None:
+        try:
+            reader, writer = await self._open()
+        except (OSError, RespError, asyncio.TimeoutError) as exc:
+            logger.warning("Cache invalidation subscription failed: %s", exc)
+            return
+        try:
+            writer.write(_encode("SUBSCRIBE", self.channel))
+            await writer.drain()
+            # Anything cached before the subscription started may have missed an invalidation.
+            self.local.clear()
+            while True:
+                reply = await _read_reply(reader)
+                if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                    self.local.invalidate_local(reply[2].decode())
+        except (OSError, ConnectionError, asyncio.IncompleteReadError) as exc:
+            logger.warning("Cache invalidation subscription lost: %s", exc)
+            self.local.clear()
+        finally:
+            writer.close()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self.local is not None:
+            value = self.local.get_nowait(key)
+            if value is not None:
+                return value
+        try:
+            value = await self._execute("GET", key)
+        except (OSError, ConnectionError, RespError, asyncio.TimeoutError) as exc:
+            logger.warning("Cache GET failed: %s", exc)
+            return None
+        if value is not None and self.local is not None and self._subscriber is not None and not self._subscriber.done():
+            self.local.set_nowait(key, value, ttl_seconds=self.local_ttl_seconds)
+        return value
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None:
+        if len(value) > self.max_entry_bytes:
+            await self.delete(key)
+            return
+        if self.local is not None:
+            self.local.invalidate_local(key)
+        args: tuple[Any, ...] = ("SET", key, value)
+        if ttl_seconds:
+            args += ("PX", max(1, int(ttl_seconds * 1000)))
+        try:
+            await self._execute(*args)
+            await self._execute("PUBLISH", self.channel, key)
+        except (OSError, ConnectionError, RespError, asyncio.TimeoutError) as exc:
+            logger.warning("Cache SET failed: %s", exc)
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        if self.local is not None:
+            for key in keys:
+                self.local.invalidate_local(key)
+        try:
+            await self._execute("DEL", *keys)
+            for key in keys:
+                await self._execute("PUBLISH", self.channel, key)
+        except (OSError, ConnectionError, RespError, asyncio.TimeoutError) as exc:
+            logger.warning("Cache DEL failed: %s", exc)
+
+    async def close(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
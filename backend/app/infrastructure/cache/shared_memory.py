@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import struct
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator, Optional
+
+_MAGIC = b"NFWCACH1"
+_HEADER = struct.Struct("<8sII")
+# digest, expires_at (0 = no TTL), touched_at, value length
+_SLOT = struct.Struct("<16sddI4x")
+_EMPTY = bytes(16)
+
+
+class SharedMemoryCache:
+    """Set-associative cache in a named shared-memory segment used by every worker on a host.
+
+    Keys hash to a bucket of ``ways`` fixed-size slots; a full bucket evicts its least
+    recently used slot. Each bucket is guarded by a byte-range ``lockf`` lock on a
+    side file, so workers only contend when they touch the same bucket. Values larger
+    than ``slot_bytes`` are not cached. Writes are visible to every worker at once,
+    so invalidation needs no messaging.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        max_bytes: int,
+        slot_bytes: int,
+        ways: int = 8,
+        lock_dir: str = "/tmp",
+    ) -> None:
+        self.name = name
+        self.ways = ways
+        self.lock_dir = lock_dir
+        self._lock_fd = os.open(os.path.join(lock_dir, f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(0):
+            self._shm = self._open_segment(max_bytes=max_bytes, slot_bytes=slot_bytes)
+        magic, self.buckets, self.slot_bytes = _HEADER.unpack_from(self._shm.buf, 0)
+        if magic != _MAGIC:
+            raise RuntimeError(f"Shared memory segment {name!r} is not a cache segment")
+        self._stride = _SLOT.size + self.slot_bytes
+
+    def _open_segment(self, *, max_bytes: int, slot_bytes: int) -> shared_memory.SharedMemory:
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            buckets = max(1, max_bytes // ((_SLOT.size + slot_bytes) * self.ways))
+            size = _HEADER.size + buckets * self.ways * (_SLOT.size + slot_bytes)
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+            _HEADER.pack_into(shm.buf, 0, _MAGIC, buckets, slot_bytes)
+        # The segment outlives any single worker; keep the resource tracker from unlinking it.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    @contextmanager
+    def _locked(self, stripe: int) -> Iterator[None]:
+        # Stripe 0 serialises segment creation; bucket ``n`` locks byte ``n + 1``.
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, stripe)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _bucket(self, digest: bytes) -> int:
+        return int.from_bytes(digest[:8], "little") % self.buckets
+
+    def _slot_offset(self, bucket: int, way: int) -> int:
+        return _HEADER.size + (bucket * self.ways + way) * self._stride
+
+    def _find(self, bucket: int, digest: bytes, now: float) -> tuple[Optional[int], int]:
+        """Return the slot holding ``digest`` (if any) and the slot to reuse otherwise."""
+        buf = self._shm.buf
+        victim, victim_touched = self._slot_offset(bucket, 0), float("inf")
+        for way in range(self.ways):
+            offset = self._slot_offset(bucket, way)
+            slot_digest, expires_at, touched_at, _ = _SLOT.unpack_from(buf, offset)
+            if slot_digest == digest:
+                return offset, offset
+            free = slot_digest == _EMPTY or (expires_at and expires_at <= now)
+            rank = -1.0 if free else touched_at
+            if rank < victim_touched:
+                victim, victim_touched = offset, rank
+        return None, victim
+
+    def get_nowait(self, key: str) -> Optional[bytes]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket = self._bucket(digest)
+        now = time.time()
+        with self._locked(bucket + 1):
+            offset, _ = self._find(bucket, digest, now)
+            if offset is None:
+                return None
+            _, expires_at, _, length = _SLOT.unpack_from(self._shm.buf, offset)
+            if expires_at and expires_at <= now:
+                _SLOT.pack_into(self._shm.buf, offset, _EMPTY, 0.0, 0.0, 0)
+                return None
+            _SLOT.pack_into(self._shm.buf, offset, digest, expires_at, now, length)
+            start = offset + _SLOT.size
+            return bytes(self._shm.buf[start : start + length])
+
+    def set_nowait(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket = self._bucket(digest)
+        now = time.time()
+        with self._locked(bucket + 1):
+            existing, victim = self._find(bucket, digest, now)
+            if len(value) > self.slot_bytes:
+                if existing is not None:
+                    _SLOT.pack_into(self._shm.buf, existing, _EMPTY, 0.0, 0.0, 0)
+                return
+            offset = existing if existing is not None else victim
+            start = offset + _SLOT.size
+            self._shm.buf[start : start + len(value)] = value
+            expires_at = now + ttl_seconds if ttl_seconds else 0.0
+            _SLOT.pack_into(self._shm.buf, offset, digest, expires_at, now, len(value))
+
+    def delete_nowait(self, key: str) -> None:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket = self._bucket(digest)
+        with self._locked(bucket + 1):
+            offset, _ = self._find(bucket, digest, time.time())
+            if offset is not None:
+                _SLOT.pack_into(self._shm.buf, offset, _EMPTY, 0.0, 0.0, 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: Optional[float] = None) -> None:
+        self.set_nowait(key, value, ttl_seconds=ttl_seconds)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.delete_nowait(key)
+
+    async def close(self) -> None:
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        """Remove the segment and lock file; only for the last process using them."""
+        # SharedMemory.unlink() unregisters the segment, so re-register it first.
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+        os.unlink(os.path.join(self.lock_dir, f"{self.name}.lock"))
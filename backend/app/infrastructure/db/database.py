@@ -1,14 +1,121 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy import text
+import asyncio
+from functools import lru_cache
+from typing import Optional
+
+from prometheus_client import REGISTRY
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
 from ...core.config import settings
+from .pool_stats import InstrumentedQueuePool, PoolCollector, pool_snapshot
+from .routing import ReadRouter
+
+# Engines are built on first use so importing the app does not load the DB driver.
+_engines: dict[str, AsyncEngine] = {}
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping == "always",
+        connect_args={"statement_cache_size": settings.db_statement_cache_size},
+    )
+
+
+class PrimarySession(Session):
+    """Session bound to the primary; commits feed the read-your-writes guard."""
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    _engines["primary"] = _create_engine(settings.db_url)
+    return _engines["primary"]
+
+
+@lru_cache(maxsize=1)
+def get_read_engine() -> Optional[AsyncEngine]:
+    if not settings.db_read_url:
+        return None
+    _engines["replica"] = _create_engine(settings.db_read_url)
+    return _engines["replica"]
+
 
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        get_engine(), expire_on_commit=False, class_=AsyncSession, sync_session_class=PrimarySession
+    )
 
-engine = create_async_engine(settings.db_url, echo=False, pool_pre_ping=True)
-SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+@lru_cache(maxsize=1)
+def get_read_router() -> ReadRouter:
+    read_engine = get_read_engine()
+    return ReadRouter(
+        primary=get_sessionmaker(),
+        replica=(
+            async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+            if read_engine is not None
+            else None
+        ),
+        read_your_writes_seconds=settings.db_read_your_writes_seconds,
+        retry_seconds=settings.db_read_retry_seconds,
+    )
+
+
+REGISTRY.register(PoolCollector(_engines))
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_write(session: Session) -> None:
+    client_key = session.info.get("client_key")
+    if client_key is not None:
+        get_read_router().record_write(client_key)
 
 
 async def healthcheck() -> bool:
-    async with engine.connect() as conn:
+    async with get_engine().connect() as conn:
         await conn.execute(text("SELECT 1"))
     return True
 
+
+async def prefill_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open up to ``connections`` pooled connections at once and return them to the pool.
+
+    The first requests after start-up then skip connect, TLS and authentication.
+    Connections beyond the pool's size would be discarded on return, so the count is
+    capped at it. Returns how many were opened; raises only if none could be.
+    """
+    connections = min(connections, engine.pool.size())
+
+    async def open_one():
+        conn = await engine.connect()
+        try:
+            await conn.execute(text("SELECT 1"))
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    # Held together, so each one is a new connection rather than the same one reused.
+    results = await asyncio.gather(*(open_one() for _ in range(connections)), return_exceptions=True)
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    if not opened and connections:
+        raise next(exc for exc in results if isinstance(exc, BaseException))
+    return len(opened)
+
+
+def pool_stats() -> dict:
+    stats = {"primary": pool_snapshot(get_engine().pool)}
+    read_engine = get_read_engine()
+    if read_engine is not None:
+        stats["replica"] = pool_snapshot(read_engine.pool)
+        stats["replica"]["available"] = get_read_router().replica_available
+    return stats
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+CHECKOUT_BUCKETS_SECONDS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class PoolStats:
+    """Checkout latency and wait counters for a connection pool."""
+
+    def __init__(self, buckets: tuple[float, ...] = CHECKOUT_BUCKETS_SECONDS) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.timeouts = 0
+
+    def observe_checkout(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.checkout_seconds_total += seconds
+        if seconds > self.checkout_seconds_max:
+            self.checkout_seconds_max = seconds
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+
+    def observe_timeout(self) -> None:
+        self.timeouts += 1
+
+    def histogram(self) -> list[tuple[str, int]]:
+        cumulative = 0
+        result: list[tuple[str, int]] = []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            cumulative += count
+            result.append((repr(bound), cumulative))
+        result.append(("+Inf", cumulative + self.bucket_counts[-1]))
+        return result
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe_timeout()
+            raise
+        self.stats.observe_checkout(time.perf_counter() - start)
+        return conn
+
+
+def pool_snapshot(pool: Any) -> dict[str, Any]:
+    snapshot: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    stats: PoolStats | None = getattr(pool, "stats", None)
+    if stats is not None:
+        snapshot.update(
+            {
+                "checkouts": stats.checkouts,
+                "checkout_timeouts": stats.timeouts,
+                "wait_seconds_total": round(stats.checkout_seconds_total, 6),
+                "wait_seconds_max": round(stats.checkout_seconds_max, 6),
+                "checkout_latency_histogram": dict(stats.histogram()),
+            }
+        )
+    return snapshot
+
+
+class PoolCollector:
+    """Prometheus collector reading live pool counters at scrape time."""
+
+    def __init__(self, engines: dict[str, Any]) -> None:
+        self.engines = engines
+
+    def collect(self):
+        size = GaugeMetricFamily("nfw_db_pool_size", "Configured pool size", labels=["pool"])
+        checked_out = GaugeMetricFamily("nfw_db_pool_checked_out", "Connections checked out", labels=["pool"])
+        overflow = GaugeMetricFamily("nfw_db_pool_overflow", "Connections open beyond pool size", labels=["pool"])
+        timeouts = CounterMetricFamily("nfw_db_pool_checkout_timeouts", "Checkouts that timed out", labels=["pool"])
+        wait = HistogramMetricFamily(
+            "nfw_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", labels=["pool"]
+        )
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+            stats: PoolStats | None = getattr(pool, "stats", None)
+            if stats is not None:
+                timeouts.add_metric([name], stats.timeouts)
+                wait.add_metric([name], stats.histogram(), sum_value=stats.checkout_seconds_total)
+        yield from (size, checked_out, overflow, timeouts, wait)
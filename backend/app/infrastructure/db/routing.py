@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class ReadRouter:
+    """Routes read-only sessions to a replica, falling back to the primary.
+
+    Clients that committed a write within ``read_your_writes_seconds`` keep
+    reading from the primary so they never observe replication lag. When the
+    replica cannot be reached it is skipped for ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: async_sessionmaker[AsyncSession],
+        replica: Optional[async_sessionmaker[AsyncSession]],
+        read_your_writes_seconds: float,
+        retry_seconds: float,
+        max_tracked_clients: int = 10_000,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self.max_tracked_clients = max_tracked_clients
+        self._recent_writes: OrderedDict[str, float] = OrderedDict()
+        self._replica_down_until = 0.0
+
+    def record_write(self, client_key: str) -> None:
+        self._recent_writes[client_key] = time.monotonic() + self.read_your_writes_seconds
+        self._recent_writes.move_to_end(client_key)
+        while len(self._recent_writes) > self.max_tracked_clients:
+            self._recent_writes.popitem(last=False)
+
+    def _wrote_recently(self, client_key: Optional[str], now: float) -> bool:
+        if client_key is None:
+            return False
+        until = self._recent_writes.get(client_key)
+        if until is None:
+            return False
+        if until <= now:
+            del self._recent_writes[client_key]
+            return False
+        return True
+
+    def should_use_replica(self, client_key: Optional[str]) -> bool:
+        if self.replica is None:
+            return False
+        now = time.monotonic()
+        if self._replica_down_until > now:
+            return False
+        return not self._wrote_recently(client_key, now)
+
+    async def read_session(self, client_key: Optional[str] = None) -> AsyncSession:
+        if self.should_use_replica(client_key):
+            session = self.replica()
+            try:
+                # Read paths issue their query immediately, so checking out now costs nothing extra
+                # and lets an unreachable replica fall back before the request fails.
+                await session.connection()
+                return session
+            except (OSError, SQLAlchemyError):
+                await session.close()
+                self._replica_down_until = time.monotonic() + self.retry_seconds
+        return self.primary()
+
+    @property
+    def replica_available(self) -> bool:
+        return self.replica is not None and self._replica_down_until <= time.monotonic()
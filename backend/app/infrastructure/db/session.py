@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """End the implicit read transaction so its connection goes back to the pool.
+
+    Writes in the repositories commit immediately, so an open transaction at this
+    point only holds reads and can be rolled back safely.
+    """
+    if session.in_transaction():
+        await session.rollback()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable, Optional
+
+from ..core.metrics import DEPENDENCY_CHECK_SECONDS, DEPENDENCY_UP
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[], Awaitable[object]]
+
+
+@dataclass(slots=True)
+class CheckResult:
+    ok: bool
+    latency_seconds: float
+    checked_at: datetime
+    error: Optional[str] = None
+
+
+def tcp_check(host: str, port: int) -> Check:
+    async def check() -> None:
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+        await writer.wait_closed()
+
+    return check
+
+
+class HealthMonitor:
+    """Probes dependencies on an interval so health endpoints answer from memory.
+
+    Readiness requires start-up warm-up to have finished and every check in
+    ``required`` to have succeeded recently; the remaining checks are reported but do
+    not take the instance out of rotation.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Check],
+        *,
+        interval_seconds: float,
+        timeout_seconds: float,
+        required: Iterable[str],
+    ) -> None:
+        self.checks = checks
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.required = frozenset(name for name in required if name in checks)
+        self.results: dict[str, CheckResult] = {}
+        self.warmed_up = False
+        self._last_run = 0.0
+
+    def mark_warmed_up(self) -> None:
+        self.warmed_up = True
+
+    async def _run_check(self, name: str, check: Check) -> None:
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout_seconds)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+        latency = time.perf_counter() - start
+        self.results[name] = CheckResult(
+            ok=error is None,
+            latency_seconds=latency,
+            checked_at=datetime.now(timezone.utc),
+            error=error,
+        )
+        DEPENDENCY_UP.labels(name).set(1 if error is None else 0)
+        DEPENDENCY_CHECK_SECONDS.labels(name).set(latency)
+
+    async def run_once(self) -> None:
+        await asyncio.gather(*(self._run_check(name, check) for name, check in self.checks.items()))
+        self._last_run = time.monotonic()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:  # pragma: no cover - checks already capture their own errors
+                logger.exception("Health monitor iteration failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    @property
+    def fresh(self) -> bool:
+        # Stale results mean the monitor itself stopped running.
+        return self._last_run > 0 and time.monotonic() - self._last_run < 3 * self.interval_seconds + self.timeout_seconds
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and self.fresh and all(
+            name in self.results and self.results[name].ok for name in self.required
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmed_up": self.warmed_up,
+            "checks": {
+                name: {
+                    "ok": result.ok,
+                    "required": name in self.required,
+                    "latency_ms": round(result.latency_seconds * 1000, 2),
+                    "checked_at": result.checked_at.isoformat(),
+                    **({"error": result.error} if result.error else {}),
+                }
+                for name, result in self.results.items()
+            },
+        }
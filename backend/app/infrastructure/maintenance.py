@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from ..application.use_cases.purge_verification_tokens import PurgeVerificationTokens
+from ..core.metrics import TOKEN_PURGE_RUNS
+from .db.database import get_sessionmaker
+from .repositories.user_repository_impl import SqlUserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPurgeJob:
+    """Runs :class:`PurgeVerificationTokens` on an interval in every worker.
+
+    Workers start at a random offset into the interval so their runs spread out; when
+    they do overlap, ``SKIP LOCKED`` makes them split the rows instead of blocking.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: float,
+        batch_size: int,
+        max_batches: int,
+        retention: timedelta,
+        pause_seconds: float,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.retention = retention
+        self.pause_seconds = pause_seconds
+
+    async def run_once(self) -> int:
+        async with get_sessionmaker()() as session:
+            use_case = PurgeVerificationTokens(SqlUserRepository(session))
+            return await use_case.execute(
+                batch_size=self.batch_size,
+                max_batches=self.max_batches,
+                retention=self.retention,
+                pause_seconds=self.pause_seconds,
+            )
+
+    async def run_forever(self) -> None:
+        await asyncio.sleep(random.uniform(0, self.interval_seconds))
+        while True:
+            try:
+                deleted = await self.run_once()
+            except Exception:
+                TOKEN_PURGE_RUNS.labels("error").inc()
+                logger.exception("Verification token purge failed")
+            else:
+                TOKEN_PURGE_RUNS.labels("ok").inc()
+                if deleted:
+                    logger.info("Purged %d verification tokens", deleted)
+            await asyncio.sleep(self.interval_seconds)
@@ -1,20 +1,53 @@
-from typing import Sequence
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import AsyncIterator, Optional, Sequence
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from ...domain.entities.experiment import Experiment
+from ...domain.entities.experiment import DailyCount, Experiment, ExperimentStats, FacetCount
 from ...domain.repositories.experiment_repository import ExperimentRepository
+from ..db.session import release_connection
+from ...core.metrics import DB_QUERY_SECONDS, timed
+
+
+def _like_prefix(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
 
 
 class SqlExperimentRepository(ExperimentRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="create")
     async def create(self, exp: Experiment) -> None:
+        # Facet and daily rollups move in the same statement, so they never drift from the rows.
         await self.session.execute(
             text(
                 """
-                INSERT INTO experiments (id, brand, model, year, created_at)
-                VALUES (:id, :brand, :model, :year, :created_at)
+                WITH inserted AS (
+                    INSERT INTO experiments (id, brand, model, year, created_at, user_id)
+                    VALUES (:id, :brand, :model, :year, :created_at, :user_id)
+                    RETURNING brand, brand_norm, model, model_norm, year, year_norm, created_at
+                ),
+                facets AS (
+                    INSERT INTO experiment_facet_counts (dimension, value, label, count)
+                    SELECT d.dimension, d.value, d.label, 1
+                    FROM inserted
+                    CROSS JOIN LATERAL (
+                        VALUES ('brand', inserted.brand_norm, btrim(inserted.brand)),
+                               ('model', inserted.model_norm, btrim(inserted.model)),
+                               ('year', inserted.year_norm, btrim(inserted.year))
+                    ) AS d(dimension, value, label)
+                    WHERE d.value IS NOT NULL
+                    ON CONFLICT (dimension, value) DO UPDATE
+                    SET count = experiment_facet_counts.count + 1,
+                        label = EXCLUDED.label
+                )
+                INSERT INTO experiment_daily_counts (day, count)
+                SELECT (inserted.created_at AT TIME ZONE 'UTC')::date, 1
+                FROM inserted
+                ON CONFLICT (day) DO UPDATE
+                SET count = experiment_daily_counts.count + 1
                 """
             ),
             {
@@ -23,29 +56,205 @@ class SqlExperimentRepository(ExperimentRepository):
                 "model": exp.model,
                 "year": exp.year,
                 "created_at": exp.created_at,
+                "user_id": exp.user_id,
             },
         )
         await self.session.commit()
 
-    async def list(self, limit: int = 50, offset: int = 0) -> Sequence[Experiment]:
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="get")
+    async def get(self, exp_id: str) -> Optional[Experiment]:
+        row = (
+            await self.session.execute(
+                text("SELECT id, brand, model, year, created_at, user_id FROM experiments WHERE id = :id"),
+                {"id": exp_id},
+            )
+        ).first()
+        await release_connection(self.session)
+        if row is None:
+            return None
+        return Experiment(
+            id=str(row[0]), brand=row[1], model=row[2], year=row[3], created_at=row[4],
+            user_id=str(row[5]) if row[5] is not None else None,
+        )
+
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="list")
+    async def list(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        *,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year: Optional[str] = None,
+        q: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Sequence[Experiment]:
+        # Filters are expected lower-cased and trimmed, matching the *_norm columns.
+        conditions = []
+        params: dict = {"limit": limit, "offset": offset}
+        order = "created_at DESC"
+        if user_id:
+            # Same order as idx_experiments_user_created_at_id, which also carries every
+            # selected column, so an owner's pages never touch the heap.
+            conditions.append("user_id = :user_id")
+            params["user_id"] = user_id
+            order = "created_at DESC, id"
+        for column, value in (("brand_norm", brand), ("model_norm", model), ("year_norm", year)):
+            if value:
+                conditions.append(f"{column} = :{column}")
+                params[column] = value
+        if q:
+            conditions.append("(search_norm LIKE :q_prefix OR search_norm LIKE :q_word)")
+            params["q_prefix"] = _like_prefix(q)
+            params["q_word"] = "% " + _like_prefix(q)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         rows = (
             await self.session.execute(
                 text(
-                    "SELECT id, brand, model, year, created_at FROM experiments ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+                    f"SELECT id, brand, model, year, created_at, user_id FROM experiments {where} "
+                    f"ORDER BY {order} LIMIT :limit OFFSET :offset"
                 ),
-                {"limit": limit, "offset": offset},
+                params,
             )
         ).all()
+        await release_connection(self.session)
         return [
             Experiment(
-                id=r[0], brand=r[1], model=r[2], year=r[3], created_at=r[4]
+                id=r[0], brand=r[1], model=r[2], year=r[3], created_at=r[4],
+                user_id=str(r[5]) if r[5] is not None else None,
             )
             for r in rows
         ]
 
+    async def stream(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        since_id: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Experiment]]:
+        """Yield every experiment after the watermark in (created_at, id) order, one batch at a time.
+
+        Rows come from a server-side cursor, so memory is bounded by ``batch_size``.
+        """
+        params: dict = {}
+        where = ""
+        if since is not None and since_id is not None:
+            where = "WHERE (created_at, id) > (:since, :since_id)"
+            params.update(since=since, since_id=since_id)
+        elif since is not None:
+            where = "WHERE created_at > :since"
+            params["since"] = since
+        result = await self.session.stream(
+            text(f"SELECT id, brand, model, year, created_at FROM experiments {where} ORDER BY created_at, id"),
+            params,
+        )
+        try:
+            # AsyncSession.stream ignores yield_per on the statement, so the size goes here.
+            async for rows in result.partitions(batch_size):
+                yield [
+                    Experiment(id=str(r[0]), brand=r[1], model=r[2], year=r[3], created_at=r[4])
+                    for r in rows
+                ]
+        finally:
+            await result.close()
+            await release_connection(self.session)
+
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="delete")
     async def delete(self, exp_id: str) -> None:
         await self.session.execute(
-            text("DELETE FROM experiments WHERE id = :id"), {"id": exp_id}
+            text(
+                """
+                WITH deleted AS (
+                    DELETE FROM experiments WHERE id = :id
+                    RETURNING brand_norm, model_norm, year_norm, created_at
+                ),
+                facets AS (
+                    UPDATE experiment_facet_counts f
+                    SET count = f.count - 1
+                    FROM deleted
+                    CROSS JOIN LATERAL (
+                        VALUES ('brand', deleted.brand_norm),
+                               ('model', deleted.model_norm),
+                               ('year', deleted.year_norm)
+                    ) AS d(dimension, value)
+                    WHERE f.dimension = d.dimension AND f.value = d.value
+                )
+                UPDATE experiment_daily_counts c
+                SET count = c.count - 1
+                FROM deleted
+                WHERE c.day = (deleted.created_at AT TIME ZONE 'UTC')::date
+                """
+            ),
+            {"id": exp_id},
         )
         await self.session.commit()
 
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="facet_counts")
+    async def facet_counts(self, *, limit: int) -> dict[str, list[FacetCount]]:
+        rows = (
+            await self.session.execute(
+                text(
+                    """
+                    SELECT dimension, value, label, count
+                    FROM (
+                        SELECT dimension, value, label, count,
+                               row_number() OVER (PARTITION BY dimension ORDER BY count DESC, value) AS rank
+                        FROM experiment_facet_counts
+                        WHERE count > 0
+                    ) ranked
+                    WHERE rank <= :limit
+                    ORDER BY dimension, rank
+                    """
+                ),
+                {"limit": limit},
+            )
+        ).all()
+        await release_connection(self.session)
+        facets: dict[str, list[FacetCount]] = {"brand": [], "model": [], "year": []}
+        for r in rows:
+            facets.setdefault(r[0], []).append(FacetCount(value=r[1], label=r[2], count=r[3]))
+        return facets
+
+    @timed(DB_QUERY_SECONDS, repository="experiment", method="stats")
+    async def stats(self, *, since: date, limit: int) -> ExperimentStats:
+        # Reads only the rollup tables, never experiments itself.
+        rows = (
+            await self.session.execute(
+                text(
+                    """
+                    SELECT 'total' AS kind, NULL AS key, NULL AS label, COALESCE(sum(count), 0)::bigint AS count
+                    FROM experiment_daily_counts
+                    UNION ALL
+                    SELECT 'day', day::text, NULL, count
+                    FROM experiment_daily_counts
+                    WHERE day >= :since AND count > 0
+                    UNION ALL
+                    SELECT dimension, value, label, count
+                    FROM (
+                        SELECT dimension, value, label, count,
+                               row_number() OVER (PARTITION BY dimension ORDER BY count DESC, value) AS rank
+                        FROM experiment_facet_counts
+                        WHERE dimension IN ('brand', 'year') AND count > 0
+                    ) ranked
+                    WHERE rank <= :limit
+                    """
+                ),
+                {"since": since, "limit": limit},
+            )
+        ).all()
+        await release_connection(self.session)
+        stats = ExperimentStats(total=0, by_brand=[], by_year=[], by_day=[])
+        for kind, key, label, count in rows:
+            if kind == "total":
+                stats.total = int(count)
+            elif kind == "day":
+                stats.by_day.append(DailyCount(day=date.fromisoformat(key), count=count))
+            elif kind == "brand":
+                stats.by_brand.append(FacetCount(value=key, label=label, count=count))
+            else:
+                stats.by_year.append(FacetCount(value=key, label=label, count=count))
+        stats.by_day.sort(key=lambda d: d.day)
+        stats.by_brand.sort(key=lambda f: (-f.count, f.value))
+        stats.by_year.sort(key=lambda f: (-f.count, f.value))
+        return stats
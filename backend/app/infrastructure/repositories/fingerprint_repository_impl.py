@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...domain.entities.fingerprint import InputFingerprint
+from ...domain.repositories.fingerprint_repository import FingerprintRepository
+from ..db.session import release_connection
+from ...core.metrics import DB_QUERY_SECONDS, timed
+
+
+def _to_signed(value: int) -> int:
+    # Hashes are unsigned 64-bit; BIGINT is signed.
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & 0xFFFF_FFFF_FFFF_FFFF
+
+
+class SqlFingerprintRepository(FingerprintRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @timed(DB_QUERY_SECONDS, repository="fingerprint", method="save")
+    async def save(self, fingerprint: InputFingerprint) -> Optional[datetime]:
+        # created_at comes from the database at insert time, not from when the photos were
+        # hashed: the row lands after generation, and other workers poll by created_at.
+        result = await self.session.execute(
+            text(
+                """
+                INSERT INTO generation_input_fingerprints
+                    (experiment_id, prompt_digest, car_hashes, wheel_hash, created_at)
+                VALUES (:experiment_id, :prompt_digest, :car_hashes, :wheel_hash, NOW())
+                ON CONFLICT (experiment_id) DO NOTHING
+                RETURNING created_at
+                """
+            ),
+            {
+                "experiment_id": fingerprint.experiment_id,
+                "prompt_digest": fingerprint.prompt_digest,
+                "car_hashes": [_to_signed(h) for h in fingerprint.car_hashes],
+                "wheel_hash": _to_signed(fingerprint.wheel_hash) if fingerprint.wheel_hash is not None else None,
+            },
+        )
+        created_at = result.scalar()
+        await self.session.commit()
+        return created_at
+
+    @timed(DB_QUERY_SECONDS, repository="fingerprint", method="list_since")
+    async def list_since(self, since: Optional[datetime]) -> Sequence[InputFingerprint]:
+        rows = (
+            await self.session.execute(
+                text(
+                    """
+                    SELECT f.experiment_id, f.prompt_digest, f.car_hashes, f.wheel_hash, f.created_at, e.user_id
+                    FROM generation_input_fingerprints f
+                    JOIN experiments e ON e.id = f.experiment_id
+                    WHERE CAST(:since AS TIMESTAMPTZ) IS NULL OR f.created_at > :since
+                    ORDER BY f.created_at
+                    """
+                ),
+                {"since": since},
+            )
+        ).all()
+        await release_connection(self.session)
+        return [
+            InputFingerprint(
+                experiment_id=str(r[0]),
+                prompt_digest=r[1],
+                car_hashes=tuple(_to_unsigned(h) for h in r[2]),
+                wheel_hash=_to_unsigned(r[3]) if r[3] is not None else None,
+                created_at=r[4],
+                user_id=str(r[5]) if r[5] is not None else None,
+            )
+            for r in rows
+        ]
@@ -0,0 +1,73 @@
+from typing import Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...domain.entities.rendition import ExperimentRendition
+from ...domain.repositories.rendition_repository import RenditionRepository
+from ..db.session import release_connection
+from ...core.metrics import DB_QUERY_SECONDS, timed
+
+
+class SqlRenditionRepository(RenditionRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @timed(DB_QUERY_SECONDS, repository="rendition", method="save_many")
+    async def save_many(self, renditions: Sequence[ExperimentRendition]) -> None:
+        if not renditions:
+            return
+        await self.session.execute(
+            text(
+                """
+                INSERT INTO experiment_renditions (experiment_id, size, format, width, height, data, created_at)
+                VALUES (:experiment_id, :size, :format, :width, :height, :data, :created_at)
+                ON CONFLICT (experiment_id, size, format) DO NOTHING
+                """
+            ),
+            [
+                {
+                    "experiment_id": r.experiment_id,
+                    "size": r.size,
+                    "format": r.format,
+                    "width": r.width,
+                    "height": r.height,
+                    "data": r.data,
+                    "created_at": r.created_at,
+                }
+                for r in renditions
+            ],
+        )
+        await self.session.commit()
+
+    @timed(DB_QUERY_SECONDS, repository="rendition", method="get")
+    async def get(
+        self, experiment_id: str, *, size: str, formats: Sequence[str]
+    ) -> Optional[ExperimentRendition]:
+        # One round trip picks the most preferred stored format.
+        row = (
+            await self.session.execute(
+                text(
+                    """
+                    SELECT experiment_id, size, format, width, height, data, created_at
+                    FROM experiment_renditions
+                    WHERE experiment_id = :experiment_id
+                      AND size = :size
+                      AND format = ANY(CAST(:formats AS TEXT[]))
+                    ORDER BY array_position(CAST(:formats AS TEXT[]), format)
+                    LIMIT 1
+                    """
+                ),
+                {"experiment_id": experiment_id, "size": size, "formats": list(formats)},
+            )
+        ).first()
+        await release_connection(self.session)
+        if row is None:
+            return None
+        return ExperimentRendition(
+            experiment_id=str(row[0]),
+            size=row[1],
+            format=row[2],
+            width=row[3],
+            height=row[4],
+            data=row[5],
+            created_at=row[6],
+        )
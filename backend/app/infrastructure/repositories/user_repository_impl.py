@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from ...domain.entities.user import User, EmailVerificationToken
+from ...domain.entities.user import User, EmailVerificationToken, VerificationOutcome
 from ...domain.repositories.user_repository import UserRepository
+from ..db.session import release_connection
+from ...core.metrics import DB_QUERY_SECONDS, timed
 
 
 class SqlUserRepository(UserRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="create")
     async def create(self, user: User) -> None:
         await self.session.execute(
             text(
@@ -40,6 +43,7 @@ class SqlUserRepository(UserRepository):
         )
         await self.session.commit()
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="update")
     async def update(self, user: User) -> None:
         await self.session.execute(
             text(
@@ -70,6 +74,7 @@ class SqlUserRepository(UserRepository):
         )
         await self.session.commit()
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="get_by_email")
     async def get_by_email(self, email: str) -> Optional[User]:
         result = await self.session.execute(
             text(
@@ -83,8 +88,10 @@ class SqlUserRepository(UserRepository):
             {"email": email},
         )
         row = result.first()
+        await release_connection(self.session)
         return self._row_to_user(row) if row else None
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="get_by_id")
     async def get_by_id(self, user_id: str) -> Optional[User]:
         result = await self.session.execute(
             text(
@@ -98,8 +105,10 @@ class SqlUserRepository(UserRepository):
             {"user_id": user_id},
         )
         row = result.first()
+        await release_connection(self.session)
         return self._row_to_user(row) if row else None
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="get_by_provider")
     async def get_by_provider(
         self, *, provider: str, provider_user_id: str
     ) -> Optional[User]:
@@ -115,8 +124,10 @@ class SqlUserRepository(UserRepository):
             {"provider": provider, "provider_user_id": provider_user_id},
         )
         row = result.first()
+        await release_connection(self.session)
         return self._row_to_user(row) if row else None
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="create_verification_token")
     async def create_verification_token(
         self, token: EmailVerificationToken
     ) -> None:
@@ -140,6 +151,7 @@ class SqlUserRepository(UserRepository):
         )
         await self.session.commit()
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="get_verification_token")
     async def get_verification_token(
         self, token: str
     ) -> Optional[EmailVerificationToken]:
@@ -154,8 +166,10 @@ class SqlUserRepository(UserRepository):
             {"token": token},
         )
         row = result.first()
+        await release_connection(self.session)
         return self._row_to_token(row) if row else None
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="mark_token_consumed")
     async def mark_token_consumed(self, token: str) -> None:
         await self.session.execute(
             text(
@@ -169,6 +183,85 @@ class SqlUserRepository(UserRepository):
         )
         await self.session.commit()
 
+    @timed(DB_QUERY_SECONDS, repository="user", method="consume_verification_token")
+    async def consume_verification_token(
+        self, token: str
+    ) -> tuple[VerificationOutcome, Optional[User]]:
+        # The token UPDATE takes the row lock, so of two concurrent submissions only one
+        # matches "consumed_at IS NULL"; the other sees no activated row and reports "used".
+        result = await self.session.execute(
+            text(
+                """
+                WITH target AS (
+                    SELECT consumed_at, expires_at
+                    FROM email_verification_tokens
+                    WHERE token = :token
+                ),
+                consumed AS (
+                    UPDATE email_verification_tokens
+                    SET consumed_at = NOW()
+                    WHERE token = :token
+                      AND consumed_at IS NULL
+                      AND expires_at > NOW()
+                    RETURNING user_id
+                ),
+                activated AS (
+                    UPDATE users
+                    SET is_active = TRUE,
+                        email_verified_at = COALESCE(users.email_verified_at, NOW()),
+                        updated_at = NOW()
+                    FROM consumed
+                    WHERE users.id = consumed.user_id
+                    RETURNING users.id, users.email, users.display_name, users.provider,
+                              users.provider_user_id, users.password_hash, users.is_active,
+                              users.email_verified_at, users.created_at, users.updated_at
+                )
+                SELECT
+                    CASE
+                        WHEN a.id IS NOT NULL THEN 'verified'
+                        WHEN t.consumed_at IS NULL AND t.expires_at <= NOW() THEN 'expired'
+                        ELSE 'used'
+                    END AS outcome,
+                    a.id, a.email, a.display_name, a.provider, a.provider_user_id, a.password_hash,
+                    a.is_active, a.email_verified_at, a.created_at, a.updated_at
+                FROM target t
+                LEFT JOIN activated a ON TRUE
+                """
+            ),
+            {"token": token},
+        )
+        row = result.first()
+        await self.session.commit()
+        if row is None:
+            return VerificationOutcome.INVALID, None
+        outcome = VerificationOutcome(row[0])
+        return outcome, self._row_to_user(row[1:]) if outcome is VerificationOutcome.VERIFIED else None
+
+    @timed(DB_QUERY_SECONDS, repository="user", method="purge_verification_tokens")
+    async def purge_verification_tokens(
+        self, *, batch_size: int, retention: timedelta
+    ) -> int:
+        # Deleting by ctid keeps each statement to one bounded batch; SKIP LOCKED avoids
+        # waiting on rows a concurrent verification is updating.
+        result = await self.session.execute(
+            text(
+                """
+                DELETE FROM email_verification_tokens
+                WHERE ctid IN (
+                    SELECT ctid
+                    FROM email_verification_tokens
+                    WHERE expires_at < NOW() - CAST(:retention AS interval)
+                       OR consumed_at < NOW() - CAST(:retention AS interval)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                """
+            ),
+            {"batch_size": batch_size, "retention": retention},
+        )
+        await self.session.commit()
+        return result.rowcount
+
     def _row_to_user(self, row) -> User:
         return User(
             id=row[0],
@@ -1,11 +1,151 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from .core.config import settings
-from .infrastructure.db.database import healthcheck
-from .presentation.api.v1.routers import router as experiments_router
+from .core.profiling import ProfileRing, TaskSampler
+from .core.tracing import configure_tracing, shutdown_tracing
+from .core.warmup import run_warmup, warm_imports
+from .application.services.image_generation import get_model_caller
+from .infrastructure.cache.factory import get_cache
+from .infrastructure.db.database import get_engine, get_read_engine, healthcheck, pool_stats, prefill_pool
+from .infrastructure.health import HealthMonitor, tcp_check
+from .infrastructure.maintenance import TokenPurgeJob
+from .presentation.api.v1.auth_router import get_email_sender, get_oauth_verifier, get_password_hasher
+from .presentation.api.v1.routers import (
+    get_generation_admission,
+    get_generation_input_store,
+    get_image_generator,
+    get_rendition_pipeline,
+    router as experiments_router,
+)
+from .presentation.middleware.admission import AdmissionMiddleware
+from .presentation.middleware.profiling import ProfilingMiddleware
+from .presentation.routing import InstrumentedRoute
+
+
+def _dependency_checks() -> dict:
+    checks = {
+        "db": healthcheck,
+        "gemini": tcp_check("generativelanguage.googleapis.com", 443),
+        "google_oauth": tcp_check("www.googleapis.com", 443),
+        "apple_oauth": tcp_check("appleid.apple.com", 443),
+    }
+    if settings.smtp_host:
+        checks["smtp"] = tcp_check(settings.smtp_host, settings.smtp_port)
+    return checks
+
+
+health_monitor = HealthMonitor(
+    _dependency_checks(),
+    interval_seconds=settings.health_check_interval_seconds,
+    timeout_seconds=settings.health_check_timeout_seconds,
+    required=settings.health_required_checks,
+)
+
+
+def _warmup_steps() -> dict:
+    async def db_pool() -> None:
+        await prefill_pool(get_engine(), settings.warmup_db_connections)
+        read_engine = get_read_engine()
+        if read_engine is not None:
+            await prefill_pool(read_engine, settings.warmup_db_connections)
+
+    async def provider_keys() -> None:
+        await get_oauth_verifier().prefetch_keys()
+
+    async def bcrypt() -> None:
+        # Calibration hashes through passlib directly; one hash through the context loads its backend.
+        hasher = await asyncio.to_thread(get_password_hasher)
+        await asyncio.to_thread(hasher.hash, "warm-up")
+
+    async def model_client() -> None:
+        get_model_caller()
+        await asyncio.to_thread(get_image_generator)
+
+    async def smtp_client() -> None:
+        await asyncio.to_thread(get_email_sender().warm_up)
+
+    steps = {"db_pool": db_pool, "provider_keys": provider_keys, "bcrypt": bcrypt}
+    if settings.google_api_key:
+        steps["model_client"] = model_client
+    if settings.smtp_host and settings.smtp_from_email:
+        steps["smtp_client"] = smtp_client
+    return steps
+
+
+async def _warm_up() -> None:
+    await run_warmup(_warmup_steps(), timeout_seconds=settings.warmup_timeout_seconds)
+    health_monitor.mark_warmed_up()
 
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background: list[asyncio.Task] = [asyncio.create_task(health_monitor.run_forever())]
+    if settings.warm_imports:
+        background.append(asyncio.create_task(warm_imports()))
+    if settings.token_purge_enabled:
+        job = TokenPurgeJob(
+            interval_seconds=settings.token_purge_interval_seconds,
+            batch_size=settings.token_purge_batch_size,
+            max_batches=settings.token_purge_max_batches,
+            retention=timedelta(hours=settings.token_purge_retention_hours),
+            pause_seconds=settings.token_purge_pause_ms / 1000,
+        )
+        background.append(asyncio.create_task(job.run_forever()))
+    if settings.warmup_enabled:
+        # Readiness stays off until warm-up finishes, so no traffic reaches a cold worker.
+        background.append(asyncio.create_task(_warm_up()))
+    else:
+        # Calibrating bcrypt takes a few hashes; do it before the first login, off the loop.
+        await asyncio.to_thread(get_password_hasher)
+        health_monitor.mark_warmed_up()
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        caches = [get_cache()] if get_cache.cache_info().currsize else []
+        if get_generation_input_store.cache_info().currsize and get_generation_input_store().cache not in caches:
+            caches.append(get_generation_input_store().cache)
+        for cache in caches:
+            await cache.close()
+        if get_rendition_pipeline.cache_info().currsize:
+            get_rendition_pipeline().shutdown()
+        if get_model_caller.cache_info().currsize:
+            get_model_caller().shutdown()
+        shutdown_tracing()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.router.route_class = InstrumentedRoute
+
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=get_generation_admission(),
+    paths={"/api/v1/experiments/generate", "/api/v1/experiments/generate/batch"},
+)
+
+if settings.tracing_enabled:
+    configure_tracing(
+        exporter=settings.tracing_exporter,
+        service_name=settings.tracing_service_name,
+        sample_rate=settings.tracing_sample_rate,
+        otlp_endpoint=settings.tracing_otlp_endpoint,
+        file_path=settings.tracing_file_path,
+    )
+
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sampler=TaskSampler(interval_seconds=settings.profiling_interval_ms / 1000),
+        ring=ProfileRing(settings.profiling_dir, max_profiles=settings.profiling_max_profiles),
+        sample_rate=settings.profiling_sample_rate,
+        admin_token=settings.profiling_admin_token,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,9 +157,34 @@ app.add_middleware(
 
 
 @app.get("/health")
-async def health():
-    await healthcheck()
+async def health(response: Response):
+    ready = health_monitor.ready
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ok": ready}
+
+
+@app.get("/health/live")
+async def health_live():
     return {"ok": True}
 
 
+@app.get("/health/ready")
+async def health_ready(response: Response):
+    snapshot = health_monitor.snapshot()
+    if not snapshot["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return snapshot
+
+
+@app.get("/health/pool")
+async def health_pool():
+    return pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(experiments_router, prefix="/api/v1")
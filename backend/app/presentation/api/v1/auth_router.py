@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import logging
 from functools import lru_cache
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from ....core.config import settings
-from ....infrastructure.db.database import SessionLocal
-from ....infrastructure.repositories.user_repository_impl import SqlUserRepository
-from ....application.services.security import PasswordHasher, TokenService
+from ....domain.repositories.user_repository import UserRepository
+from ....application.services.login_throttle import LoginThrottle
+from ....application.services.security import PasswordHasher, TokenService, calibrate_bcrypt_rounds
 from ....application.services.oauth import OAuthVerifier
 from ....application.services.email import EmailSender
+from ....infrastructure.cache.factory import get_cache
+from ....infrastructure.cache.memory import MemoryCache
 from ....application.use_cases.register_user import RegisterUser
 from ....application.use_cases.login_user import LoginUser
 from ....application.use_cases.verify_email import VerifyEmail
@@ -22,7 +25,10 @@ from ....application.exceptions import (
     VerificationTokenError,
     OAuthVerificationError,
     EmailDispatchError,
+    RateLimitExceededError,
 )
+from .dependencies import get_client_key, get_user_repository
+from ...routing import InstrumentedRoute
 from .auth_schemas import (
     RegisterRequest,
     RegisterResponse,
@@ -33,14 +39,38 @@ from .auth_schemas import (
     OAuthResponse,
 )
 
-
-async def get_session() -> AsyncSession:
-    async with SessionLocal() as session:
-        yield session
+logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_password_hasher() -> PasswordHasher:
-    return PasswordHasher()
+    rounds = settings.bcrypt_rounds
+    if rounds is None:
+        rounds = calibrate_bcrypt_rounds(
+            settings.bcrypt_target_ms / 1000,
+            min_rounds=settings.bcrypt_min_rounds,
+            max_rounds=settings.bcrypt_max_rounds,
+        )
+        logger.info("Calibrated bcrypt cost to %d rounds for a %.0f ms target", rounds, settings.bcrypt_target_ms)
+    return PasswordHasher(rounds=rounds, min_rounds=settings.bcrypt_min_rounds)
+
+
+@lru_cache(maxsize=1)
+def get_login_throttle() -> LoginThrottle | None:
+    if not settings.login_throttle_enabled:
+        return None
+    if settings.login_throttle_store == "cache":
+        store = get_cache()
+    else:
+        store = MemoryCache(max_bytes=settings.login_throttle_max_bytes)
+    return LoginThrottle(
+        store,
+        email_limit=settings.login_throttle_email_limit,
+        ip_limit=settings.login_throttle_ip_limit,
+        window_seconds=settings.login_throttle_window_seconds,
+        lockout_base_seconds=settings.login_lockout_base_seconds,
+        lockout_max_seconds=settings.login_lockout_max_seconds,
+    )
 
 
 def get_token_service() -> TokenService:
@@ -51,10 +81,64 @@ def get_token_service() -> TokenService:
     )
 
 
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_optional_user_id(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    token_service: TokenService = Depends(get_token_service),
+) -> str | None:
+    """Id of the signed-in user, or ``None`` without a bearer token. A bad token is still a 401."""
+    if credentials is None:
+        return None
+    import jwt
+
+    try:
+        claims = token_service.decode(credentials.credentials)
+    except jwt.PyJWTError as exc:
+        raise _unauthorized("Invalid or expired access token") from exc
+    subject = claims.get("sub")
+    if not subject:
+        raise _unauthorized("Invalid or expired access token")
+    return str(subject)
+
+
+def get_user_id_or_anonymous(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+    token_service: TokenService = Depends(get_token_service),
+) -> str | None:
+    """Like ``get_optional_user_id``, but an invalid or expired token counts as anonymous.
+
+    For endpoints that work without an account: a stale token in the browser must not
+    turn them into 401s.
+    """
+    try:
+        return get_optional_user_id(credentials, token_service)
+    except HTTPException:
+        return None
+
+
+def get_current_user_id(user_id: str | None = Depends(get_optional_user_id)) -> str:
+    if user_id is None:
+        raise _unauthorized("Not authenticated")
+    return user_id
+
+
+@lru_cache(maxsize=1)
 def get_oauth_verifier() -> OAuthVerifier:
+    # One verifier per worker so its signing key cache survives between requests.
     return OAuthVerifier(
         google_client_id=settings.google_client_id,
         apple_client_id=settings.apple_client_id,
+        cache=get_cache(),
     )
 
 
@@ -78,17 +162,16 @@ def get_email_sender() -> EmailSender:
     )
 
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=InstrumentedRoute)
 
 
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     payload: RegisterRequest,
-    session: AsyncSession = Depends(get_session),
+    repo: UserRepository = Depends(get_user_repository),
     hasher: PasswordHasher = Depends(get_password_hasher),
     email_sender: EmailSender = Depends(get_email_sender),
 ):
-    repo = SqlUserRepository(session)
     use_case = RegisterUser(repo, hasher)
     try:
         _, token = await use_case.execute(
@@ -116,14 +199,21 @@ async def register_user(
 @router.post("/login", response_model=TokenResponse)
 async def login_user(
     payload: LoginRequest,
-    session: AsyncSession = Depends(get_session),
+    repo: UserRepository = Depends(get_user_repository),
     hasher: PasswordHasher = Depends(get_password_hasher),
     token_service: TokenService = Depends(get_token_service),
+    throttle: LoginThrottle | None = Depends(get_login_throttle),
+    client_key: str | None = Depends(get_client_key),
 ):
-    repo = SqlUserRepository(session)
-    use_case = LoginUser(repo, hasher, token_service)
+    use_case = LoginUser(repo, hasher, token_service, throttle)
     try:
-        tokens = await use_case.execute(email=payload.email, password=payload.password)
+        tokens = await use_case.execute(email=payload.email, password=payload.password, client_key=client_key)
+    except RateLimitExceededError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(int(exc.retry_after))},
+        ) from exc
     except InvalidCredentialsError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
     except EmailNotVerifiedError as exc:
@@ -135,9 +225,8 @@ async def login_user(
 @router.post("/verify", response_model=dict)
 async def verify_email(
     payload: VerifyEmailRequest,
-    session: AsyncSession = Depends(get_session),
+    repo: UserRepository = Depends(get_user_repository),
 ):
-    repo = SqlUserRepository(session)
     use_case = VerifyEmail(repo)
     try:
         await use_case.execute(token=payload.token)
@@ -150,11 +239,10 @@ async def verify_email(
 @router.post("/oauth", response_model=OAuthResponse)
 async def oauth_sign_in(
     payload: OAuthRequest,
-    session: AsyncSession = Depends(get_session),
+    repo: UserRepository = Depends(get_user_repository),
     token_service: TokenService = Depends(get_token_service),
     verifier: OAuthVerifier = Depends(get_oauth_verifier),
 ):
-    repo = SqlUserRepository(session)
     verify_kwargs = {"provider": payload.provider}
     if payload.token is not None:
         verify_kwargs["token"] = payload.token
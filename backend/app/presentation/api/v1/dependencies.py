@@ -0,0 +1,82 @@
+import ipaddress
+from functools import lru_cache
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ....core.config import settings
+from ....domain.repositories.experiment_repository import ExperimentRepository
+from ....domain.repositories.fingerprint_repository import FingerprintRepository
+from ....domain.repositories.rendition_repository import RenditionRepository
+from ....domain.repositories.user_repository import UserRepository
+from ....infrastructure.db.database import get_read_router, get_sessionmaker
+from ....infrastructure.repositories.experiment_repository_impl import SqlExperimentRepository
+from ....infrastructure.repositories.fingerprint_repository_impl import SqlFingerprintRepository
+from ....infrastructure.repositories.rendition_repository_impl import SqlRenditionRepository
+from ....infrastructure.repositories.user_repository_impl import SqlUserRepository
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks() -> tuple:
+    return tuple(ipaddress.ip_network(network, strict=False) for network in settings.trusted_proxies)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks())
+
+
+def get_client_key(request: Request) -> str | None:
+    """Client address, read from X-Forwarded-For only as far as trusted proxies vouch for it.
+
+    Each proxy appends the address it received the request from, so the header is
+    walked right to left past our own proxies; the first other address is the client.
+    Anything further left was written by the client and is ignored, as is the whole
+    header when the peer is not a trusted proxy.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted_proxy(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()] if forwarded else []
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+async def get_session(request: Request) -> AsyncSession:
+    # AsyncSession checks a connection out on its first statement and hands it back
+    # on commit/rollback, so holding the session object for the request is free.
+    async with get_sessionmaker()() as session:
+        session.info["client_key"] = get_client_key(request)
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    session = await get_read_router().read_session(get_client_key(request))
+    async with session:
+        yield session
+
+
+def get_user_repository(session: AsyncSession = Depends(get_session)) -> UserRepository:
+    return SqlUserRepository(session)
+
+
+def get_experiment_repository(session: AsyncSession = Depends(get_session)) -> ExperimentRepository:
+    return SqlExperimentRepository(session)
+
+
+def get_experiment_read_repository(session: AsyncSession = Depends(get_read_session)) -> ExperimentRepository:
+    return SqlExperimentRepository(session)
+
+
+def get_rendition_read_repository(session: AsyncSession = Depends(get_read_session)) -> RenditionRepository:
+    return SqlRenditionRepository(session)
+
+
+def get_fingerprint_read_repository(session: AsyncSession = Depends(get_read_session)) -> FingerprintRepository:
+    return SqlFingerprintRepository(session)
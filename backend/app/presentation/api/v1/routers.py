@@ -1,69 +1,328 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Literal
+from uuid import UUID
+
 import fastapi
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.ext.asyncio import AsyncSession
-from ....infrastructure.db.database import SessionLocal
-from ....infrastructure.repositories.experiment_repository_impl import SqlExperimentRepository
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from ....domain.entities.fingerprint import InputFingerprint
+from ....domain.repositories.experiment_repository import ExperimentRepository
+from ....domain.repositories.fingerprint_repository import FingerprintRepository
+from ....domain.repositories.rendition_repository import RenditionRepository
+from ....application.exceptions import ModelTimeoutError, ModelUnavailableError
 from ....application.use_cases.create_experiment import CreateExperiment
+from ....application.use_cases.create_renditions import CreateRenditions
 from ....application.use_cases.list_experiments import ListExperiments
-from .schemas import ExperimentIn, ExperimentOut
+from ....application.use_cases.get_experiment_facets import GetExperimentFacets
+from ....application.use_cases.get_experiment_stats import GetExperimentStats
+from ....application.use_cases.export_experiments import ExportExperiments
+from ....application.use_cases.generate_variants import GenerateVariants
+from ....application.use_cases.find_reusable_generation import FindReusableGeneration
+from ....application.use_cases.record_input_fingerprint import RecordInputFingerprint
+from .schemas import ExperimentFacetsOut, ExperimentIn, ExperimentOut, ExperimentStatsOut
 from ....application.services.image_generation import ImageGenerator
-from .auth_router import router as auth_router
+from ....application.services.admission import AdmissionController
+from ....application.services.cache import CacheBackend
+from ....application.services.generation_inputs import GenerationInputs, GenerationInputStore, downscale_image
+from ....application.services.image_hashing import FingerprintIndex, fingerprint_inputs
+from ....application.services.renditions import MEDIA_TYPES, RenditionPipeline, preferred_formats
+from ....core.config import settings
+from ....infrastructure.cache.factory import get_cache
+from ....infrastructure.cache.memory import MemoryCache
+from ....infrastructure.cache.redis import RedisCache
+from ....infrastructure.db.database import get_read_router, get_sessionmaker
+from ....infrastructure.repositories.experiment_repository_impl import SqlExperimentRepository
+from ....infrastructure.repositories.fingerprint_repository_impl import SqlFingerprintRepository
+from ....infrastructure.repositories.rendition_repository_impl import SqlRenditionRepository
+from .auth_router import get_current_user_id, get_user_id_or_anonymous, router as auth_router
+from .dependencies import (
+    get_client_key,
+    get_experiment_read_repository,
+    get_experiment_repository,
+    get_fingerprint_read_repository,
+    get_rendition_read_repository,
+)
+from ...routing import InstrumentedRoute
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _image_generator() -> ImageGenerator:
+    return ImageGenerator()
+
+
+def get_image_generator() -> ImageGenerator:
+    try:
+        return _image_generator()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@lru_cache(maxsize=1)
+def get_generation_admission() -> AdmissionController:
+    return AdmissionController(
+        max_concurrency=settings.generate_max_concurrency,
+        max_queue=settings.generate_max_queue,
+        queue_timeout_seconds=settings.generate_queue_timeout_seconds,
+        rate_per_second=settings.generate_rate_per_minute / 60,
+        burst=settings.generate_rate_burst,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_rendition_pipeline() -> RenditionPipeline:
+    return RenditionPipeline(max_workers=settings.rendition_workers, quality=settings.rendition_quality)
+
+
+async def store_renditions(experiment_id: str, image: bytes) -> None:
+    # Runs after the response is sent, so it needs its own session.
+    try:
+        async with get_sessionmaker()() as session:
+            use_case = CreateRenditions(SqlRenditionRepository(session), get_rendition_pipeline())
+            await use_case.execute(experiment_id=experiment_id, image=image)
+    except Exception:
+        logger.exception("Failed to store renditions for experiment %s", experiment_id)
+
+
+@lru_cache(maxsize=1)
+def get_fingerprint_index() -> FingerprintIndex:
+    return FingerprintIndex(refresh_seconds=settings.input_reuse_refresh_seconds)
+
+
+async def store_fingerprint(fingerprint: InputFingerprint) -> None:
+    try:
+        async with get_sessionmaker()() as session:
+            use_case = RecordInputFingerprint(SqlFingerprintRepository(session), get_fingerprint_index())
+            await use_case.execute(fingerprint)
+    except Exception:
+        logger.exception("Failed to store input fingerprint for experiment %s", fingerprint.experiment_id)
+
+
+def get_listing_cache() -> CacheBackend | None:
+    return get_cache() if settings.cache_listings else None
+
 
+async def store_generation(
+    experiment_id: str, user_id: str | None, image: bytes, fingerprint: InputFingerprint | None
+) -> None:
+    """Attach a result to the experiment, but only one the caller could have created.
 
-async def get_session() -> AsyncSession:
-    async with SessionLocal() as session:
-        yield session
+    The id comes from the client, so anyone could name another user's experiment.
+    Anonymous experiments are open to anyone, but stored renditions and fingerprints
+    are never replaced, so a later caller cannot overwrite them.
+    """
+    try:
+        async with get_sessionmaker()() as session:
+            experiment = await SqlExperimentRepository(session).get(experiment_id)
+    except Exception:
+        logger.exception("Failed to look up experiment %s", experiment_id)
+        return
+    if experiment is None or experiment.user_id not in (None, user_id):
+        logger.warning("Not storing generation for experiment %s: missing or owned by another user", experiment_id)
+        return
+    await store_renditions(experiment_id, image)
+    if fingerprint is not None:
+        fingerprint.user_id = experiment.user_id
+        await store_fingerprint(fingerprint)
 
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
-experiments_router = APIRouter(prefix="/experiments", tags=["experiments"])
+experiments_router = APIRouter(prefix="/experiments", tags=["experiments"], route_class=InstrumentedRoute)
 
 
 @experiments_router.post("", response_model=ExperimentOut, status_code=201)
-async def create_experiment(payload: ExperimentIn, session: AsyncSession = Depends(get_session)):
-    repo = SqlExperimentRepository(session)
-    use_case = CreateExperiment(repo)
+async def create_experiment(
+    payload: ExperimentIn,
+    repo: ExperimentRepository = Depends(get_experiment_repository),
+    cache: CacheBackend = Depends(get_cache),
+    user_id: str | None = Depends(get_user_id_or_anonymous),
+):
+    use_case = CreateExperiment(repo, cache)
     exp = await use_case.execute(
         id=payload.id,
         brand=payload.brand,
         model=payload.model,
         year=payload.year,
         created_at=payload.created_at,
+        user_id=user_id,
     )
     return ExperimentOut(**exp.__dict__)
 
 
+def _replica_settle_seconds() -> float:
+    return settings.db_read_your_writes_seconds if settings.db_read_url else 0
+
+
 @experiments_router.get("", response_model=list[ExperimentOut])
-async def list_experiments(limit: int = 50, offset: int = 0, session: AsyncSession = Depends(get_session)):
-    repo = SqlExperimentRepository(session)
-    use_case = ListExperiments(repo)
-    items = await use_case.execute(limit=limit, offset=offset)
+async def list_experiments(
+    limit: int = 50,
+    offset: int = 0,
+    brand: str | None = None,
+    model: str | None = None,
+    year: str | None = None,
+    q: str | None = Query(default=None, max_length=100, description="Prefix of a word in brand, model or year"),
+    repo: ExperimentRepository = Depends(get_experiment_read_repository),
+    cache: CacheBackend | None = Depends(get_listing_cache),
+):
+    use_case = ListExperiments(
+        repo,
+        cache,
+        ttl_seconds=settings.cache_list_ttl_seconds,
+        settle_seconds=_replica_settle_seconds(),
+    )
+    items = await use_case.execute(limit=limit, offset=offset, brand=brand, model=model, year=year, q=q)
     return [ExperimentOut(**i.__dict__) for i in items]
 
 
-@experiments_router.post("/generate", response_description="Generated image bytes")
-async def generate_image(
-    brand: str | None = Form(default=None),
-    model: str | None = Form(default=None),
-    year: str | None = Form(default=None),
-    car_photos: list[UploadFile] = File(default_factory=list),
-    wheel_photo: UploadFile | None = File(default=None),
+@experiments_router.get("/mine", response_model=list[ExperimentOut])
+async def list_my_experiments(
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    brand: str | None = None,
+    model: str | None = None,
+    year: str | None = None,
+    q: str | None = Query(default=None, max_length=100, description="Prefix of a word in brand, model or year"),
+    user_id: str = Depends(get_current_user_id),
+    repo: ExperimentRepository = Depends(get_experiment_read_repository),
+    cache: CacheBackend | None = Depends(get_listing_cache),
 ):
-    # Read files into memory
-    car_images: list[tuple[bytes, str]] = []
-    for f in car_photos[:3]:
-        data = await f.read()
-        car_images.append((data, f.content_type or "image/jpeg"))
-    wheel: tuple[bytes, str] | None = None
-    if wheel_photo is not None:
-        wheel = (await wheel_photo.read(), wheel_photo.content_type or "image/jpeg")
+    use_case = ListExperiments(
+        repo,
+        cache,
+        ttl_seconds=settings.cache_list_ttl_seconds,
+        settle_seconds=_replica_settle_seconds(),
+    )
+    items = await use_case.execute(
+        limit=limit, offset=offset, brand=brand, model=model, year=year, q=q, user_id=user_id
+    )
+    return [ExperimentOut(**i.__dict__) for i in items]
 
-    if not car_images:
-        raise HTTPException(status_code=400, detail="At least one car photo is required")
 
-    # Build prompt
+@experiments_router.get("/facets", response_model=ExperimentFacetsOut)
+async def experiment_facets(
+    limit: int = Query(default=50, ge=1, le=500),
+    repo: ExperimentRepository = Depends(get_experiment_read_repository),
+    cache: CacheBackend | None = Depends(get_listing_cache),
+):
+    use_case = GetExperimentFacets(
+        repo,
+        cache,
+        ttl_seconds=settings.cache_facets_ttl_seconds,
+        settle_seconds=_replica_settle_seconds(),
+    )
+    facets = await use_case.execute(limit=limit)
+    return {dimension: [f.__dict__ for f in items] for dimension, items in facets.items()}
+
+
+@experiments_router.get("/stats", response_model=ExperimentStatsOut)
+async def experiment_stats(
+    days: int = Query(default=30, ge=1, le=366),
+    limit: int = Query(default=20, ge=1, le=500),
+    repo: ExperimentRepository = Depends(get_experiment_read_repository),
+    cache: CacheBackend | None = Depends(get_listing_cache),
+):
+    use_case = GetExperimentStats(
+        repo,
+        cache,
+        ttl_seconds=settings.cache_facets_ttl_seconds,
+        settle_seconds=_replica_settle_seconds(),
+    )
+    return await use_case.execute(days=days, limit=limit)
+
+
+@experiments_router.get("/export", response_description="Every experiment as NDJSON or CSV")
+async def export_experiments(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: datetime | None = Query(default=None, description="Export rows created after this watermark"),
+    since_id: UUID | None = Query(default=None, description="Id of the last exported row, to break created_at ties"),
+):
+    client_key = get_client_key(request)
+
+    async def body():
+        # The response streams after dependencies are torn down, so the session lives here.
+        session = await get_read_router().read_session(client_key)
+        async with session:
+            use_case = ExportExperiments(SqlExperimentRepository(session))
+            async for chunk in use_case.execute(
+                format=format,
+                since=since,
+                since_id=str(since_id) if since_id else None,
+                batch_size=settings.export_batch_size,
+            ):
+                yield chunk
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="experiments.{format}"'},
+    )
+
+
+@experiments_router.get("/{experiment_id}/image", response_description="Stored rendition of the generated image")
+async def get_experiment_image(
+    experiment_id: UUID,
+    request: Request,
+    size: Literal["thumb", "medium", "full"] = "medium",
+    repo: RenditionRepository = Depends(get_rendition_read_repository),
+):
+    rendition = await repo.get(str(experiment_id), size=size, formats=preferred_formats(request.headers.get("accept")))
+    if rendition is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{size}-{rendition.format}-{int(rendition.created_at.timestamp())}"'
+    headers = {"ETag": etag, "Vary": "Accept", "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return fastapi.Response(status_code=304, headers=headers)
+    return fastapi.Response(content=rendition.data, media_type=MEDIA_TYPES[rendition.format], headers=headers)
+
+
+GenerationTier = Literal["preview", "full"]
+
+
+@lru_cache(maxsize=1)
+def get_generation_input_store() -> GenerationInputStore:
+    if settings.generate_inputs_store == "cache" and settings.cache_backend == "redis":
+        # Uploads run to megabytes: past the shared client's entry limit and command timeout.
+        cache = RedisCache(
+            settings.cache_url,
+            max_entry_bytes=settings.generate_inputs_max_bytes,
+            command_timeout_seconds=settings.generate_inputs_timeout_seconds,
+        )
+    elif settings.generate_inputs_store == "cache":
+        cache = get_cache()
+    else:
+        cache = MemoryCache(max_bytes=settings.generate_inputs_max_bytes)
+    return GenerationInputStore(cache, ttl_seconds=settings.generate_inputs_ttl_seconds)
+
+
+def _tier_model(tier: str) -> str:
+    return settings.generate_preview_model if tier == "preview" else settings.generate_full_model
+
+
+def _downscale_images(images: list[tuple[bytes, str]]) -> list[tuple[bytes, str]]:
+    return [
+        downscale_image(image, max_edge=settings.generate_preview_max_edge, quality=settings.generate_preview_quality)
+        for image in images
+    ]
+
+
+def _downscale_inputs(
+    car_images: list[tuple[bytes, str]], wheel: tuple[bytes, str] | None
+) -> tuple[list[tuple[bytes, str]], tuple[bytes, str] | None]:
+    return _downscale_images(car_images), _downscale_images([wheel])[0] if wheel is not None else None
+
+
+def _build_prompt(brand: str | None, model: str | None, year: str | None) -> str:
     prompt = (
         "Replace the wheels in the provided car photo(s) with the wheels from the wheel photo. "
         "Preserve the original car, scene, lighting, reflections, and realism. Return a single photorealistic result."
@@ -71,15 +330,159 @@ async def generate_image(
     )
     if brand or model or year:
         prompt += f" Car metadata: brand={brand or ''}, model={model or ''}, year={year or ''}."
+    return prompt
+
+
+@experiments_router.post("/generate", response_description="Generated image bytes")
+async def generate_image(
+    background_tasks: BackgroundTasks,
+    experiment_id: UUID | None = Form(default=None),
+    brand: str | None = Form(default=None),
+    model: str | None = Form(default=None),
+    year: str | None = Form(default=None),
+    car_photos: list[UploadFile] = File(default_factory=list),
+    wheel_photo: UploadFile | None = File(default=None),
+    reuse: bool = Form(default=True),
+    tier: GenerationTier | None = Form(default=None),
+    inputs_id: str | None = Form(default=None, max_length=64, description="Reuse the photos of an earlier preview"),
+    gen: ImageGenerator = Depends(get_image_generator),
+    fingerprints: FingerprintRepository = Depends(get_fingerprint_read_repository),
+    renditions: RenditionRepository = Depends(get_rendition_read_repository),
+    inputs_store: GenerationInputStore = Depends(get_generation_input_store),
+    user_id: str | None = Depends(get_user_id_or_anonymous),
+):
+    tier = tier or settings.generate_default_tier
+    if inputs_id is not None:
+        stored = await inputs_store.load(inputs_id)
+        if stored is None:
+            raise HTTPException(status_code=410, detail="Uploaded photos have expired, upload them again")
+        prompt, car_images, wheel = stored.prompt, stored.car_images, stored.wheel_image
+    else:
+        # Read files into memory
+        car_images = []
+        for f in car_photos[:3]:
+            data = await f.read()
+            car_images.append((data, f.content_type or "image/jpeg"))
+        wheel = None
+        if wheel_photo is not None:
+            wheel = (await wheel_photo.read(), wheel_photo.content_type or "image/jpeg")
+
+        if not car_images:
+            raise HTTPException(status_code=400, detail="At least one car photo is required")
+
+        prompt = _build_prompt(brand, model, year)
+
+    fingerprint = None
+    # Hashing only pays off to look for a match, or to record a stored result for later runs.
+    if settings.input_reuse_enabled and (reuse or (experiment_id is not None and tier == "full")):
+        try:
+            fingerprint = await run_in_threadpool(
+                fingerprint_inputs,
+                prompt=prompt,
+                car_images=car_images,
+                wheel_image=wheel,
+                experiment_id=str(experiment_id) if experiment_id is not None else None,
+            )
+        except Exception:
+            logger.debug("Could not fingerprint uploaded photos", exc_info=True)
+
+    similar = None
+    if fingerprint is not None and reuse:
+        use_case = FindReusableGeneration(
+            get_fingerprint_index(),
+            fingerprints,
+            renditions,
+            max_distance=settings.input_reuse_max_distance,
+        )
+        try:
+            similar = await use_case.execute(fingerprint, user_id=user_id)
+        except Exception:
+            logger.warning("Near-duplicate lookup failed", exc_info=True)
+    if similar is not None:
+        if experiment_id is not None:
+            background_tasks.add_task(store_generation, str(experiment_id), user_id, similar.data, fingerprint)
+        return fastapi.Response(
+            content=similar.data,
+            media_type=MEDIA_TYPES[similar.format],
+            headers={"X-Reused-Experiment": similar.experiment_id, "X-Generation-Tier": "full"},
+        )
+
+    headers = {"X-Generation-Tier": tier}
+    send_car, send_wheel = car_images, wheel
+    if tier == "preview":
+        send_car, send_wheel = await run_in_threadpool(_downscale_inputs, car_images, wheel)
+        # The originals, so the full tier can run later without a second upload.
+        headers["X-Inputs-Id"] = inputs_id or await inputs_store.save(GenerationInputs(prompt, car_images, wheel))
 
     # Call generator
     try:
-        gen = ImageGenerator()
-        image_bytes = gen.generate(prompt=prompt, car_images=car_images, wheel_image=wheel)
+        image_bytes = await gen.generate_async(
+            prompt=prompt,
+            car_parts=gen.prepare_inputs(send_car),
+            wheel_parts=gen.prepare_inputs([send_wheel]) if send_wheel is not None else (),
+            model=_tier_model(tier),
+        )
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+    except ModelTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return fastapi.Response(content=image_bytes, media_type="image/png")
+    # Previews are not kept; only a full-tier result becomes the experiment's image.
+    if experiment_id is not None and tier == "full":
+        background_tasks.add_task(store_generation, str(experiment_id), user_id, image_bytes, fingerprint)
+    return fastapi.Response(content=image_bytes, media_type="image/png", headers=headers)
+
+
+@experiments_router.post("/generate/batch", response_description="NDJSON line per variant as it completes")
+async def generate_variants(
+    brand: str | None = Form(default=None),
+    model: str | None = Form(default=None),
+    year: str | None = Form(default=None),
+    variants: int = Form(default=1, ge=1),
+    tier: GenerationTier | None = Form(default=None),
+    car_photos: list[UploadFile] = File(default_factory=list),
+    wheel_photos: list[UploadFile] = File(default_factory=list),
+    gen: ImageGenerator = Depends(get_image_generator),
+    admission: AdmissionController = Depends(get_generation_admission),
+):
+    tier = tier or settings.generate_default_tier
+    car_images = [(await f.read(), f.content_type or "image/jpeg") for f in car_photos[:3]]
+    wheel_images = [(await f.read(), f.content_type or "image/jpeg") for f in wheel_photos]
+    if not car_images:
+        raise HTTPException(status_code=400, detail="At least one car photo is required")
+    if not wheel_images:
+        raise HTTPException(status_code=400, detail="At least one wheel photo is required")
+    if len(wheel_images) * variants > settings.generate_batch_max_variants:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may produce at most {settings.generate_batch_max_variants} images",
+        )
+    if tier == "preview":
+        car_images = await run_in_threadpool(_downscale_images, car_images)
+        wheel_images = await run_in_threadpool(_downscale_images, wheel_images)
+
+    use_case = GenerateVariants(gen, max_concurrency=settings.generate_batch_concurrency, admission=admission)
+    results = use_case.execute(
+        prompt=_build_prompt(brand, model, year),
+        car_images=car_images,
+        wheel_images=wheel_images,
+        variants=variants,
+        model=_tier_model(tier),
+    )
+
+    async def body():
+        async for result in results:
+            line = {"index": result.index, "wheel_index": result.wheel_index, "variant": result.variant}
+            if result.error is not None:
+                line["error"] = result.error
+            else:
+                line["mime_type"] = "image/png"
+                line["image"] = base64.b64encode(result.image).decode()
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 
 router.include_router(auth_router)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 
 class ExperimentIn(BaseModel):
@@ -17,3 +17,26 @@ class ExperimentOut(BaseModel):
     year: str | None
     created_at: datetime
 
+
+class FacetOut(BaseModel):
+    value: str
+    label: str
+    count: int
+
+
+class ExperimentFacetsOut(BaseModel):
+    brand: list[FacetOut]
+    model: list[FacetOut]
+    year: list[FacetOut]
+
+
+class DailyCountOut(BaseModel):
+    day: date
+    count: int
+
+
+class ExperimentStatsOut(BaseModel):
+    total: int
+    by_brand: list[FacetOut]
+    by_year: list[FacetOut]
+    by_day: list[DailyCountOut]
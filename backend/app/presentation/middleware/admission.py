@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ...application.exceptions import RateLimitExceededError, ServiceOverloadedError
+from ...application.services.admission import AdmissionController
+from ..api.v1.dependencies import get_client_key
+
+
+class AdmissionMiddleware:
+    """Admits requests for the given paths through an ``AdmissionController``.
+
+    Runs before the request body is read, so shed requests never upload their files.
+    """
+
+    def __init__(self, app: ASGIApp, *, controller: AdmissionController, paths: Iterable[str]) -> None:
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(get_client_key(Request(scope)))
+        except RateLimitExceededError as exc:
+            await self._reject(scope, receive, send, status_code=429, exc=exc)
+            return
+        except ServiceOverloadedError as exc:
+            await self._reject(scope, receive, send, status_code=503, exc=exc)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.observe_service_time(time.monotonic() - start)
+            self.controller.release()
+
+    async def _reject(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        *,
+        status_code: int,
+        exc: RateLimitExceededError | ServiceOverloadedError,
+    ) -> None:
+        response = JSONResponse(
+            {"detail": str(exc)},
+            status_code=status_code,
+            headers={"Retry-After": str(int(exc.retry_after))},
+        )
+        await response(scope, receive, send)
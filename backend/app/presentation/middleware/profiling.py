@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import random
+import uuid
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ...core.profiling import ProfileRing, TaskSampler
+
+PROFILE_HEADER = "x-profile-request"
+
+
+class ProfilingMiddleware:
+    """Profiles a sampled fraction of requests, or those carrying the admin header.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        sampler: TaskSampler,
+        ring: ProfileRing,
+        sample_rate: float = 0.0,
+        admin_token: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        self.sampler = sampler
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.admin_token:
+            supplied = Headers(scope=scope).get(PROFILE_HEADER)
+            if supplied is not None and hmac.compare_digest(supplied.encode(), self.admin_token.encode()):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        status_code = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profile = self.sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.sampler.stop(profile)
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+            }
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.ring.write, profile_id, profile, meta)
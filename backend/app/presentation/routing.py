@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Coroutine, Any
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ..core.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS
+from ..core.tracing import parse_traceparent, span
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that records latency and in-flight requests under its path template.
+
+    Each request is also the server span of a trace, continuing the caller's
+    ``traceparent`` when one is sent.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def instrumented_handler(request: Request) -> Response:
+            method = request.method
+            in_flight = HTTP_IN_FLIGHT.labels(method, route)
+            in_flight.inc()
+            start = time.perf_counter()
+            status_code = 500
+            with span(
+                f"{method} {route}",
+                kind="server",
+                parent=parse_traceparent(request.headers.get("traceparent")),
+                **{"http.method": method, "http.route": route},
+            ) as current:
+                try:
+                    response = await handler(request)
+                    status_code = response.status_code
+                    return response
+                except HTTPException as exc:
+                    status_code = exc.status_code
+                    raise
+                except RequestValidationError:
+                    status_code = 422
+                    raise
+                finally:
+                    if current is not None:
+                        current.set_attribute("http.status_code", status_code)
+                    in_flight.dec()
+                    HTTP_REQUEST_SECONDS.labels(method, route, str(status_code)).observe(
+                        time.perf_counter() - start
+                    )
+
+        return instrumented_handler
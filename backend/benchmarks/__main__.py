@@ -0,0 +1,118 @@
+"""Run the benchmark suite offline against local fakes.
+
+    python -m benchmarks                          # every scenario
+    python -m benchmarks list login -c 32 -n 2000
+    python -m benchmarks --json > baseline.json
+    python -m benchmarks --baseline baseline.json --max-regression 0.2
+
+The run exits non-zero when any request failed. With ``--baseline`` it also does when
+any scenario's p99 latency grows, or its throughput drops, by more than
+``--max-regression`` relative to the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from .harness import Harness, run_fixed_concurrency
+from .scenarios import LOAD_SCENARIOS, MICRO_SCENARIOS, SEED
+
+ALL_SCENARIOS = {**LOAD_SCENARIOS, **MICRO_SCENARIOS}
+COLUMNS = ("scenario", "concurrency", "requests", "errors", "throughput_per_second", "p50_ms", "p99_ms", "rss_mb")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(ALL_SCENARIOS)} (default: all)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--micro-requests", type=int, default=50, help="iterations for micro-benchmarks")
+    parser.add_argument("--generate-latency-ms", type=float, default=200.0, help="fake Gemini latency")
+    parser.add_argument("--cache", choices=("memory", "shared", "redis"), default="memory", help="cache backend")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--baseline", help="JSON results from a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.scenarios) - set(ALL_SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def errors(results: list[dict]) -> list[str]:
+    # Failed requests are usually fast, so they would otherwise pass for good throughput.
+    return [
+        f"{result['scenario']}: {result['errors']} of {result['requests']} requests failed"
+        for result in results
+        if result["errors"]
+    ]
+
+
+def regressions(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    previous = {item["scenario"]: item for item in baseline}
+    failures = errors(results)
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        if before["p99_ms"] and result["p99_ms"] > before["p99_ms"] * (1 + max_regression):
+            failures.append(f"{result['scenario']}: p99 {before['p99_ms']}ms -> {result['p99_ms']}ms")
+        if result["throughput_per_second"] < before["throughput_per_second"] * (1 - max_regression):
+            failures.append(
+                f"{result['scenario']}: throughput {before['throughput_per_second']}/s "
+                f"-> {result['throughput_per_second']}/s"
+            )
+    return failures
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    random.seed(SEED)
+    names = args.scenarios or list(ALL_SCENARIOS)
+    results = []
+    async with Harness(
+        generate_latency_seconds=args.generate_latency_ms / 1000,
+        generate_concurrency=args.concurrency,
+        cache_backend=args.cache,
+    ) as harness:
+        for name in names:
+            operation = await ALL_SCENARIOS[name](harness)
+            micro = name in MICRO_SCENARIOS
+            result = await run_fixed_concurrency(
+                name,
+                operation,
+                concurrency=1 if micro else args.concurrency,
+                requests=args.micro_requests if micro else args.requests,
+                warmup=min(args.warmup, 3) if micro else args.warmup,
+            )
+            results.append(result.as_dict())
+    return results
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("  ".join(f"{c:>21}" for c in COLUMNS))
+        for result in results:
+            print("  ".join(f"{result[c]!s:>21}" for c in COLUMNS))
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            failures = regressions(results, json.load(fh), args.max_regression)
+    else:
+        failures = errors(results)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,366 @@
+"""In-process stand-ins for the database, Gemini, SMTP, Redis and OAuth providers."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional, Sequence
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.domain.entities.experiment import DailyCount, Experiment, ExperimentStats, FacetCount
+from app.domain.entities.user import EmailVerificationToken, User, VerificationOutcome
+
+
+class InMemoryUserRepository:
+    def __init__(self) -> None:
+        self.users: dict[str, User] = {}
+        self.by_email: dict[str, str] = {}
+        self.by_provider: dict[tuple[str, str], str] = {}
+        self.tokens: dict[str, EmailVerificationToken] = {}
+
+    def _index(self, user: User) -> None:
+        self.users[user.id] = replace(user)
+        self.by_email[user.email] = user.id
+        if user.provider_user_id:
+            self.by_provider[(user.provider, user.provider_user_id)] = user.id
+
+    async def create(self, user: User) -> None:
+        self._index(user)
+
+    async def update(self, user: User) -> None:
+        self._index(user)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        user_id = self.by_email.get(email)
+        return replace(self.users[user_id]) if user_id else None
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        user = self.users.get(user_id)
+        return replace(user) if user else None
+
+    async def get_by_provider(self, *, provider: str, provider_user_id: str) -> Optional[User]:
+        user_id = self.by_provider.get((provider, provider_user_id))
+        return replace(self.users[user_id]) if user_id else None
+
+    async def create_verification_token(self, token: EmailVerificationToken) -> None:
+        self.tokens[token.token] = replace(token)
+
+    async def get_verification_token(self, token: str) -> Optional[EmailVerificationToken]:
+        record = self.tokens.get(token)
+        return replace(record) if record else None
+
+    async def mark_token_consumed(self, token: str) -> None:
+        self.tokens[token].consumed_at = datetime.utcnow()
+
+    async def consume_verification_token(self, token: str) -> tuple[VerificationOutcome, Optional[User]]:
+        record = self.tokens.get(token)
+        if record is None:
+            return VerificationOutcome.INVALID, None
+        now = datetime.utcnow()
+        if record.consumed_at is not None:
+            return VerificationOutcome.USED, None
+        if record.expires_at <= now:
+            return VerificationOutcome.EXPIRED, None
+        record.consumed_at = now
+        user = self.users[record.user_id]
+        user.is_active = True
+        user.email_verified_at = user.email_verified_at or now
+        user.updated_at = now
+        return VerificationOutcome.VERIFIED, replace(user)
+
+    async def purge_verification_tokens(self, *, batch_size: int, retention: timedelta) -> int:
+        cutoff = datetime.utcnow() - retention
+        stale = [
+            key
+            for key, record in self.tokens.items()
+            if record.expires_at < cutoff or (record.consumed_at is not None and record.consumed_at < cutoff)
+        ][:batch_size]
+        for key in stale:
+            del self.tokens[key]
+        return len(stale)
+
+
+class InMemoryExperimentRepository:
+    def __init__(self) -> None:
+        self.items: list[Experiment] = []
+
+    async def create(self, exp: Experiment) -> None:
+        self.items.append(exp)
+        self.items.sort(key=lambda e: e.created_at, reverse=True)
+
+    async def get(self, exp_id: str) -> Optional[Experiment]:
+        return next((e for e in self.items if e.id == exp_id), None)
+
+    async def list(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        *,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year: Optional[str] = None,
+        q: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Sequence[Experiment]:
+        def norm(value: Optional[str]) -> str:
+            return (value or "").strip().lower()
+
+        def matches(e: Experiment) -> bool:
+            if user_id and e.user_id != user_id:
+                return False
+            if brand and norm(e.brand) != brand or model and norm(e.model) != model or year and norm(e.year) != year:
+                return False
+            words = " ".join(filter(None, (norm(e.brand), norm(e.model), norm(e.year)))).split()
+            return not q or any(word.startswith(q) for word in words)
+
+        return [e for e in self.items if matches(e)][offset : offset + limit]
+
+    async def delete(self, exp_id: str) -> None:
+        self.items = [e for e in self.items if e.id != exp_id]
+
+    async def stream(
+        self,
+        *,
+        since: Optional[datetime] = None,
+        since_id: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Experiment]]:
+        rows = sorted(self.items, key=lambda e: (e.created_at, e.id))
+        if since is not None:
+            rows = [e for e in rows if (e.created_at, e.id) > (since, since_id or "\uffff")]
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    async def facet_counts(self, *, limit: int) -> dict[str, list[FacetCount]]:
+        facets: dict[str, list[FacetCount]] = {}
+        for dimension in ("brand", "model", "year"):
+            counts = Counter((getattr(e, dimension) or "").strip() for e in self.items)
+            counts.pop("", None)
+            facets[dimension] = [
+                FacetCount(value=label.lower(), label=label, count=count)
+                for label, count in counts.most_common(limit)
+            ]
+        return facets
+
+    async def stats(self, *, since: date, limit: int) -> ExperimentStats:
+        facets = await self.facet_counts(limit=limit)
+        per_day = Counter(e.created_at.date() for e in self.items)
+        return ExperimentStats(
+            total=len(self.items),
+            by_brand=facets["brand"],
+            by_year=facets["year"],
+            by_day=[DailyCount(day=day, count=count) for day, count in sorted(per_day.items()) if day >= since],
+        )
+
+
+class FakeGenaiClient:
+    """Mimics ``genai.Client().models.generate_content`` with a fixed latency."""
+
+    def __init__(self, *, latency_seconds: float = 0.5, image: bytes = b"\x89PNG\r\n\x1a\n" + b"\0" * 65_536) -> None:
+        self.latency_seconds = latency_seconds
+        self.image = image
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, *, model: str, contents: list, **_: object) -> SimpleNamespace:
+        self.calls += 1
+        time.sleep(self.latency_seconds)
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=self.image, mime_type="image/png"), text=None)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+class SmtpSink:
+    """Minimal SMTP server that accepts and discards every message."""
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = 0
+        self.messages = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "SmtpSink":
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 sink ESMTP\r\n")
+        in_data = False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.messages += 1
+                    writer.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-sink\r\n250 SIZE 10485760\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+class FakeRespServer:
+    """Redis-protocol stand-in covering the commands used by ``RedisCache``."""
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = 0
+        self.data: dict[bytes, tuple[bytes, float]] = {}
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> "FakeRespServer":
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self._dispatch(args, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _dispatch(self, args: list[bytes], writer: asyncio.StreamWriter) -> bytes:
+        command = args[0].upper()
+        if command in (b"PING", b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            entry = self.data.get(args[1])
+            if entry is None or (entry[1] and entry[1] <= time.monotonic()):
+                self.data.pop(args[1], None)
+                return self._bulk(None)
+            return self._bulk(entry[0])
+        if command == b"SET":
+            expires_at = 0.0
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires_at = time.monotonic() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args[1:])
+        if command == b"PUBLISH":
+            writers = self.subscribers.get(args[1], set())
+            message = b"*3\r\n" + self._bulk(b"message") + self._bulk(args[1]) + self._bulk(args[2])
+            for subscriber in writers:
+                subscriber.write(message)
+            return b":%d\r\n" % len(writers)
+        if command == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[1], set()).add(writer)
+            return b"*3\r\n" + self._bulk(b"subscribe") + self._bulk(args[1]) + b":1\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class FakeJwksServer:
+    """Serves an RSA JWKS document and mints identity tokens signed with its key."""
+
+    def __init__(self, *, kid: str = "bench-key", latency_seconds: float = 0.0) -> None:
+        self.kid = kid
+        self.latency_seconds = latency_seconds
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        numbers = self.private_key.public_key().public_numbers()
+        self.jwks = {
+            "keys": [
+                {
+                    "kty": "RSA",
+                    "kid": kid,
+                    "use": "sig",
+                    "alg": "RS256",
+                    "n": _b64url_uint(numbers.n),
+                    "e": _b64url_uint(numbers.e),
+                }
+            ]
+        }
+        self.requests = 0
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def keys_url(self) -> str:
+        assert self._httpd is not None
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/auth/keys"
+
+    def start(self) -> "FakeJwksServer":
+        server = self
+        body = json.dumps(self.jwks).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                server.requests += 1
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+
+    def mint(self, *, sub: str, email: str, audience: Optional[str] = None) -> str:
+        now = int(time.time())
+        claims = {"iss": "https://appleid.apple.com", "sub": sub, "email": email, "iat": now, "exp": now + 600}
+        if audience:
+            claims["aud"] = audience
+        return jwt.encode(claims, self.private_key, algorithm="RS256", headers={"kid": self.kid})
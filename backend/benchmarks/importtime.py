@@ -0,0 +1,81 @@
+"""Check the cold import cost of ``app.main`` using ``python -X importtime``.
+
+    python -m benchmarks.importtime --budget-ms 1500
+
+Fails when the cumulative import time exceeds the budget, or when any module that
+should only load on first use (the provider SDKs, bcrypt, the DB driver) is imported
+eagerly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from .harness import BENCH_ENV
+
+LAZY_MODULES = (
+    "google.genai",
+    "google.auth",
+    "google.oauth2",
+    "passlib",
+    "cryptography",
+    "httpx",
+    "jwt",
+    "asyncpg",
+)
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure() -> list[tuple[int, int, str]]:
+    env = {**os.environ, **BENCH_ENV, "WARM_IMPORTS": "false"}
+    backend = Path(__file__).resolve().parent.parent
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            entries.append((int(match.group(1)), int(match.group(2)), match.group(4)))
+    return entries
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime", description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10, help="show the N slowest modules by self time")
+    args = parser.parse_args(argv)
+
+    entries = measure()
+    total_ms = next(cumulative for _, cumulative, name in entries if name == "app.main") / 1000
+    print(f"import app.main: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for self_us, _, name in sorted(entries, reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    eager = sorted(
+        name
+        for _, _, name in entries
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    if eager:
+        failures.append("eagerly imported: " + ", ".join(eager))
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
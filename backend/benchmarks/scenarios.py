@@ -0,0 +1,181 @@
+"""Load scenarios against the API and micro-benchmarks of individual hot paths."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from .harness import Harness, Operation
+
+PASSWORD = "bench-password-123"
+SEED = 1234
+
+Setup = Callable[[Harness], Awaitable[Operation]]
+
+
+async def register(h: Harness) -> Operation:
+    async def op(i: int) -> bool:
+        resp = await h.client.post(
+            "/api/v1/auth/register",
+            json={"email": f"register-{i}-{uuid4().hex[:8]}@example.com", "password": PASSWORD},
+        )
+        return resp.status_code == 201
+
+    return op
+
+
+async def login(h: Harness) -> Operation:
+    from app.application.services.security import PasswordHasher
+    from app.domain.entities.user import User
+
+    password_hash = PasswordHasher().hash(PASSWORD)
+    now = datetime.utcnow()
+    emails = [f"login-{i}@example.com" for i in range(100)]
+    for email in emails:
+        await h.users.create(
+            User(
+                id=str(uuid4()),
+                email=email,
+                display_name=None,
+                provider="local",
+                provider_user_id=None,
+                password_hash=password_hash,
+                is_active=True,
+                email_verified_at=now,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+
+    async def op(i: int) -> bool:
+        resp = await h.client.post(
+            "/api/v1/auth/login",
+            json={"email": emails[i % len(emails)], "password": PASSWORD},
+        )
+        return resp.status_code == 200
+
+    return op
+
+
+async def oauth(h: Harness) -> Operation:
+    tokens = [h.jwks.mint(sub=f"apple-{i}", email=f"apple-{i}@example.com") for i in range(100)]
+
+    async def op(i: int) -> bool:
+        resp = await h.client.post(
+            "/api/v1/auth/oauth",
+            json={"provider": "apple", "token": tokens[i % len(tokens)]},
+        )
+        return resp.status_code == 200
+
+    return op
+
+
+async def list_experiments(h: Harness) -> Operation:
+    from app.domain.entities.experiment import Experiment
+
+    rng = random.Random(SEED)
+    start = datetime(2024, 1, 1)
+    for i in range(5_000):
+        await h.experiments.create(
+            Experiment(
+                id=str(uuid4()),
+                brand=rng.choice(["BMW", "Audi", "Porsche", "Toyota", "Honda"]),
+                model=f"Model {rng.randint(1, 40)}",
+                year=str(rng.randint(1990, 2025)),
+                created_at=start + timedelta(minutes=i),
+            )
+        )
+
+    async def op(i: int) -> bool:
+        resp = await h.client.get("/api/v1/experiments", params={"limit": 50, "offset": (i * 50) % 1_000})
+        return resp.status_code == 200
+
+    return op
+
+
+async def generate(h: Harness) -> Operation:
+    rng = random.Random(SEED)
+    car = rng.randbytes(256 * 1024)
+    wheel = rng.randbytes(64 * 1024)
+
+    async def op(i: int) -> bool:
+        resp = await h.client.post(
+            "/api/v1/experiments/generate",
+            data={"brand": "BMW", "model": "M3", "year": "2020"},
+            files=[
+                ("car_photos", ("car.jpg", car, "image/jpeg")),
+                ("wheel_photo", ("wheel.jpg", wheel, "image/jpeg")),
+            ],
+        )
+        return resp.status_code == 200
+
+    return op
+
+
+async def generate_batch(h: Harness) -> Operation:
+    rng = random.Random(SEED)
+    car = rng.randbytes(256 * 1024)
+    wheels = [rng.randbytes(64 * 1024) for _ in range(2)]
+
+    async def op(i: int) -> bool:
+        resp = await h.client.post(
+            "/api/v1/experiments/generate/batch",
+            data={"brand": "BMW", "model": "M3", "year": "2020", "variants": "2"},
+            files=[("car_photos", ("car.jpg", car, "image/jpeg"))]
+            + [("wheel_photos", (f"wheel-{n}.jpg", wheel, "image/jpeg")) for n, wheel in enumerate(wheels)],
+        )
+        return resp.status_code == 200 and resp.text.count("\n") == 4 and '"error"' not in resp.text
+
+    return op
+
+
+async def password_hash(h: Harness) -> Operation:
+    from app.application.services.security import PasswordHasher
+
+    hasher = PasswordHasher()
+
+    async def op(i: int) -> bool:
+        return bool(hasher.hash(PASSWORD))
+
+    return op
+
+
+async def password_verify(h: Harness) -> Operation:
+    from app.application.services.security import PasswordHasher
+
+    hasher = PasswordHasher()
+    hashed = hasher.hash(PASSWORD)
+
+    async def op(i: int) -> bool:
+        return hasher.verify(PASSWORD, hashed)
+
+    return op
+
+
+async def access_token(h: Harness) -> Operation:
+    from app.application.services.security import TokenService
+
+    service = TokenService(secret_key="bench-secret", algorithm="HS256", access_token_expires_minutes=60)
+
+    async def op(i: int) -> bool:
+        return bool(service.create_access_token(subject=str(i), extra={"email": "bench@example.com"}))
+
+    return op
+
+
+LOAD_SCENARIOS: dict[str, Setup] = {
+    "register": register,
+    "login": login,
+    "oauth": oauth,
+    "list": list_experiments,
+    "generate": generate,
+    "generate_batch": generate_batch,
+}
+
+MICRO_SCENARIOS: dict[str, Setup] = {
+    "password_hash": password_hash,
+    "password_verify": password_verify,
+    "access_token": access_token,
+}
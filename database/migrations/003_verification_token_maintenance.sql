@@ -0,0 +1,8 @@
+-- Support the batched purge of expired and consumed verification tokens.
+-- CONCURRENTLY keeps signups and verifications flowing while the indexes build on a live table.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_email_verification_tokens_expires_at
+    ON email_verification_tokens(expires_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_email_verification_tokens_consumed_at
+    ON email_verification_tokens(consumed_at)
+    WHERE consumed_at IS NOT NULL;
@@ -0,0 +1,14 @@
+-- Pre-encoded gallery renditions of each generated image
+CREATE TABLE IF NOT EXISTS experiment_renditions (
+    experiment_id UUID NOT NULL REFERENCES experiments(id) ON DELETE CASCADE,
+    size TEXT NOT NULL,
+    format TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (experiment_id, size, format)
+);
+
+-- Encoded images do not compress further; skip TOAST compression attempts.
+ALTER TABLE experiment_renditions ALTER COLUMN data SET STORAGE EXTERNAL;
@@ -0,0 +1,64 @@
+-- Case-insensitive filtering, prefix search and facet counts for experiments
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Plain columns kept by a trigger rather than STORED generated columns: adding those
+-- rewrites the whole table under an ACCESS EXCLUSIVE lock, while these are added
+-- without a rewrite and backfilled with ordinary row updates.
+ALTER TABLE experiments
+    ADD COLUMN IF NOT EXISTS brand_norm TEXT,
+    ADD COLUMN IF NOT EXISTS model_norm TEXT,
+    ADD COLUMN IF NOT EXISTS year_norm TEXT,
+    ADD COLUMN IF NOT EXISTS search_norm TEXT;
+
+CREATE OR REPLACE FUNCTION experiments_set_norm() RETURNS trigger AS $$
+BEGIN
+    NEW.brand_norm := NULLIF(lower(btrim(NEW.brand)), '');
+    NEW.model_norm := NULLIF(lower(btrim(NEW.model)), '');
+    NEW.year_norm := NULLIF(btrim(NEW.year), '');
+    NEW.search_norm := lower(btrim(
+        coalesce(btrim(NEW.brand), '') || ' ' || coalesce(btrim(NEW.model), '') || ' ' || coalesce(btrim(NEW.year), '')
+    ));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS experiments_set_norm ON experiments;
+CREATE TRIGGER experiments_set_norm
+    BEFORE INSERT OR UPDATE OF brand, model, year ON experiments
+    FOR EACH ROW EXECUTE FUNCTION experiments_set_norm();
+
+-- search_norm is never NULL once the trigger has run, so this only touches old rows.
+UPDATE experiments SET brand = brand WHERE search_norm IS NULL;
+
+-- Equality filters served in listing order without a sort step.
+-- CONCURRENTLY keeps experiments writable while the indexes build.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_brand_created_at
+    ON experiments(brand_norm, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_model_created_at
+    ON experiments(model_norm, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_year_created_at
+    ON experiments(year_norm, created_at DESC);
+
+-- Word-prefix search (LIKE 'q%' OR LIKE '% q%') across brand, model and year
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_search_trgm
+    ON experiments USING GIN (search_norm gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS experiment_facet_counts (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+
+INSERT INTO experiment_facet_counts (dimension, value, label, count)
+SELECT d.dimension, d.value, max(d.label), count(*)
+FROM experiments e
+CROSS JOIN LATERAL (
+    VALUES ('brand', e.brand_norm, btrim(e.brand)),
+           ('model', e.model_norm, btrim(e.model)),
+           ('year', e.year_norm, btrim(e.year))
+) AS d(dimension, value, label)
+WHERE d.value IS NOT NULL
+GROUP BY d.dimension, d.value
+ON CONFLICT (dimension, value) DO NOTHING;
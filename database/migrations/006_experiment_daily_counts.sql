@@ -0,0 +1,11 @@
+-- Per-day experiment counts maintained alongside experiment_facet_counts for the stats endpoint
+CREATE TABLE IF NOT EXISTS experiment_daily_counts (
+    day DATE PRIMARY KEY,
+    count BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO experiment_daily_counts (day, count)
+SELECT (created_at AT TIME ZONE 'UTC')::date, count(*)
+FROM experiments
+GROUP BY 1
+ON CONFLICT (day) DO NOTHING;
@@ -0,0 +1,3 @@
+-- Keyset order for incremental export; also serves ORDER BY created_at DESC via a backward scan.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_created_at_id
+    ON experiments(created_at, id);
@@ -0,0 +1,12 @@
+-- Perceptual hashes of the photos each experiment was generated from, for near-duplicate reuse
+CREATE TABLE IF NOT EXISTS generation_input_fingerprints (
+    experiment_id UUID PRIMARY KEY REFERENCES experiments(id) ON DELETE CASCADE,
+    prompt_digest TEXT NOT NULL,
+    car_hashes BIGINT[] NOT NULL,
+    wheel_hash BIGINT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Workers load the table once, then poll for rows newer than their watermark
+CREATE INDEX IF NOT EXISTS idx_generation_input_fingerprints_created_at
+    ON generation_input_fingerprints(created_at);
@@ -0,0 +1,10 @@
+-- Owner of each experiment; NULL for anonymous experiments and those created before accounts
+ALTER TABLE experiments
+    ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES users(id) ON DELETE SET NULL;
+
+-- "My experiments" in listing order. The listed columns ride along in the index so
+-- per-user pages are index-only scans; anonymous rows are left out of it.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experiments_user_created_at_id
+    ON experiments(user_id, created_at DESC, id)
+    INCLUDE (brand, model, year)
+    WHERE user_id IS NOT NULL;
@@ -1,4 +1,5 @@
 import { NextRequest, NextResponse } from "next/server"
+import { forwardedClientHeaders } from "@/lib/forwarding"
 
 export const runtime = "nodejs"
 export const dynamic = "force-dynamic"
@@ -16,7 +17,7 @@ async function forward(req: NextRequest, pathSegments: string[]) {
   }
 
   const url = `${BACKEND_URL}/api/v1/auth/${target}`
-  const headers: Record<string, string> = {}
+  const headers: Record<string, string> = forwardedClientHeaders(req)
   const contentType = req.headers.get("content-type")
   if (contentType) headers["content-type"] = contentType
   const authorization = req.headers.get("authorization")
@@ -45,6 +46,11 @@ async function forward(req: NextRequest, pathSegments: string[]) {
   if (backendType) {
     responseHeaders.set("content-type", backendType)
   }
+  // Login throttling answers 429 with the wait before the next attempt.
+  const retryAfter = backendResponse.headers.get("retry-after")
+  if (retryAfter) {
+    responseHeaders.set("retry-after", retryAfter)
+  }
 
   return new NextResponse(responseBody, {
     status: backendResponse.status,
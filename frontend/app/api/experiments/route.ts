@@ -2,9 +2,12 @@ import { NextResponse } from "next/server"
 import { promises as fs } from "fs"
 import path from "path"
 import crypto from "crypto"
+import { forwardedClientHeaders } from "@/lib/forwarding"
 
 export const runtime = "nodejs"
 
+const UUID_RE = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i
+
 export async function POST(req: Request) {
   try {
     const form = await req.formData()
@@ -13,32 +16,45 @@ export async function POST(req: Request) {
     const year = String(form.get("year") ?? "")
     const carPhotos = form.getAll("carPhotos").filter(Boolean) as File[]
     const wheelPhoto = form.get("wheelPhoto") as File | null
+    const inputsId = form.get("inputsId")
 
-    if (carPhotos.length === 0) {
+    // A handle from an earlier preview stands in for the photos themselves.
+    if (carPhotos.length === 0 && !inputsId) {
       return new NextResponse("No car photos provided", { status: 400 })
     }
 
-    const id = crypto.randomUUID()
+    // Upgrading a preview to full quality continues the preview's experiment.
+    const previewOf = inputsId ? String(form.get("experimentId") ?? "") : ""
+    const upgrade = UUID_RE.test(previewOf)
+    const id = upgrade ? previewOf : crypto.randomUUID()
     const baseDir = path.join(process.cwd(), "public", "experiments", id)
     await fs.mkdir(baseDir, { recursive: true })
 
-    // Save metadata for later display if desired
-    const meta = { id, brand, model, year, createdAt: new Date().toISOString() }
-    await fs.writeFile(path.join(baseDir, "meta.json"), JSON.stringify(meta, null, 2))
-
-    // Fire-and-forget: send metadata to backend if available
     const backendUrl = process.env.BACKEND_URL || "http://localhost:8000"
-    fetch(`${backendUrl}/api/v1/experiments`, {
-      method: "POST",
-      headers: { "content-type": "application/json" },
-      body: JSON.stringify({
-        id,
-        brand,
-        model,
-        year,
-        created_at: meta.createdAt,
-      }),
-    }).catch(() => {})
+    // Forward the caller's bearer token so the experiment is saved under their account.
+    const authorization = req.headers.get("authorization")
+    if (!upgrade) {
+      // Save metadata for later display if desired
+      const meta = { id, brand, model, year, createdAt: new Date().toISOString() }
+      await fs.writeFile(path.join(baseDir, "meta.json"), JSON.stringify(meta, null, 2))
+
+      // Fire-and-forget: send metadata to backend if available
+      fetch(`${backendUrl}/api/v1/experiments`, {
+        method: "POST",
+        headers: { "content-type": "application/json", ...(authorization ? { authorization } : {}) },
+        body: JSON.stringify({
+          id,
+          brand,
+          model,
+          year,
+          created_at: meta.createdAt,
+        }),
+      })
+        .then(async (res) => {
+          if (!res.ok) console.error(`Saving experiment ${id} failed: ${res.status} ${await res.text()}`)
+        })
+        .catch(() => {})
+    }
 
     const limit = Math.min(3, carPhotos.length)
     for (let i = 0; i < limit; i++) {
@@ -55,6 +71,7 @@ export async function POST(req: Request) {
 
     // Attempt real generation via backend
     const formOut = new FormData()
+    formOut.append("experiment_id", id)
     formOut.append("brand", brand)
     formOut.append("model", model)
     formOut.append("year", year)
@@ -63,8 +80,14 @@ export async function POST(req: Request) {
       formOut.append("car_photos", f, (f as any).name || `car-${i+1}`)
     }
     if (wheelPhoto) formOut.append("wheel_photo", wheelPhoto, (wheelPhoto as any).name || "wheel")
+    const tier = form.get("tier")
+    if (tier) formOut.append("tier", String(tier))
+    if (inputsId) formOut.append("inputs_id", String(inputsId))
+    // Generation is rate limited per client address, so pass the browser's along. The
+    // token lets the backend attach the result to an experiment owned by this user.
     const genRes = await fetch(`${backendUrl}/api/v1/experiments/generate`, {
       method: "POST",
+      headers: { ...forwardedClientHeaders(req), ...(authorization ? { authorization } : {}) },
       body: formOut,
     })
     if (!genRes.ok) {
@@ -73,11 +96,21 @@ export async function POST(req: Request) {
     }
     const arrayBuf = await genRes.arrayBuffer()
     const outBuf = Buffer.from(arrayBuf)
-    const resultFile = "result.png"
+    // Reused results can come back as webp or avif. Previews get their own name so the
+    // gallery, which shows result.*, only ever picks up full-quality images.
+    const resultTier = genRes.headers.get("x-generation-tier")
+    const resultExt = inferExt(genRes.headers.get("content-type") ?? undefined) || ".png"
+    const resultFile = `${resultTier === "preview" ? "preview" : "result"}${resultExt}`
     await fs.writeFile(path.join(baseDir, resultFile), outBuf)
     const resultImage = `/experiments/${id}/${resultFile}`
 
-    return NextResponse.json({ id, resultImage })
+    // Previews come back with a handle to their uploads; pass it on so the full tier can reuse them.
+    return NextResponse.json({
+      id,
+      resultImage,
+      tier: resultTier,
+      inputsId: genRes.headers.get("x-inputs-id"),
+    })
   } catch (e: any) {
     return new NextResponse(e?.message || "Server error", { status: 500 })
   }
@@ -88,6 +121,7 @@ function inferExt(mime: string | undefined) {
   if (mime.includes("png")) return ".png"
   if (mime.includes("jpeg") || mime.includes("jpg")) return ".jpg"
   if (mime.includes("webp")) return ".webp"
+  if (mime.includes("avif")) return ".avif"
   return null
 }
 
@@ -3,10 +3,13 @@
 import { useState } from "react"
 import Link from "next/link"
 import Image from "next/image"
+import { authHeaders } from "@/lib/auth"
 
 type SubmitResult = {
   id: string
   resultImage: string
+  tier: string | null
+  inputsId: string | null
 }
 
 export default function TryPage() {
@@ -15,31 +18,19 @@ export default function TryPage() {
   const [year, setYear] = useState("")
   const [carFiles, setCarFiles] = useState<FileList | null>(null)
   const [wheelFile, setWheelFile] = useState<File | null>(null)
+  const [preview, setPreview] = useState(false)
   const [loading, setLoading] = useState(false)
   const [result, setResult] = useState<SubmitResult | null>(null)
   const [error, setError] = useState<string | null>(null)
 
-  const onSubmit = async (e: React.FormEvent) => {
-    e.preventDefault()
+  const submit = async (fd: FormData) => {
     setError(null)
-    setResult(null)
-    if (!carFiles || carFiles.length === 0) {
-      setError("Please upload at least one car photo")
-      return
-    }
     setLoading(true)
     try {
-      const fd = new FormData()
       fd.append("brand", brand)
       fd.append("model", model)
       fd.append("year", year)
-      const limit = Math.min(3, carFiles.length)
-      for (let i = 0; i < limit; i++) {
-        fd.append("carPhotos", carFiles.item(i) as File)
-      }
-      if (wheelFile) fd.append("wheelPhoto", wheelFile)
-
-      const res = await fetch("/api/experiments", { method: "POST", body: fd })
+      const res = await fetch("/api/experiments", { method: "POST", body: fd, headers: authHeaders() })
       if (!res.ok) throw new Error(await res.text())
       const data: SubmitResult = await res.json()
       setResult(data)
@@ -50,6 +41,33 @@ export default function TryPage() {
     }
   }
 
+  const onSubmit = async (e: React.FormEvent) => {
+    e.preventDefault()
+    setResult(null)
+    if (!carFiles || carFiles.length === 0) {
+      setError("Please upload at least one car photo")
+      return
+    }
+    const fd = new FormData()
+    const limit = Math.min(3, carFiles.length)
+    for (let i = 0; i < limit; i++) {
+      fd.append("carPhotos", carFiles.item(i) as File)
+    }
+    if (wheelFile) fd.append("wheelPhoto", wheelFile)
+    fd.append("tier", preview ? "preview" : "full")
+    await submit(fd)
+  }
+
+  // The server kept the preview's photos, so the full-quality run needs no second upload.
+  const onUpgrade = async () => {
+    if (!result?.inputsId) return
+    const fd = new FormData()
+    fd.append("tier", "full")
+    fd.append("inputsId", result.inputsId)
+    fd.append("experimentId", result.id)
+    await submit(fd)
+  }
+
   return (
     <main className="mx-auto max-w-3xl px-6 py-10">
       <div className="flex items-center justify-between">
@@ -104,6 +122,11 @@ export default function TryPage() {
           </label>
         </div>
 
+        <label className="flex items-center gap-2 text-sm">
+          <input type="checkbox" checked={preview} onChange={e=>setPreview(e.target.checked)} />
+          Quick preview first (lower quality, faster)
+        </label>
+
         <button
           type="submit"
           disabled={loading}
@@ -117,10 +140,22 @@ export default function TryPage() {
 
       {result && (
         <div className="mt-8">
-          <h2 className="mb-2 text-xl font-semibold">Your generated image</h2>
+          <h2 className="mb-2 text-xl font-semibold">
+            {result.tier === "preview" ? "Your preview" : "Your generated image"}
+          </h2>
           <div className="relative aspect-video w-full overflow-hidden rounded-lg border">
             <Image src={result.resultImage} alt="result" fill className="object-contain bg-white" />
           </div>
+          {result.tier === "preview" && result.inputsId && (
+            <button
+              type="button"
+              onClick={onUpgrade}
+              disabled={loading}
+              className="mt-4 rounded-md bg-black px-4 py-2 text-white disabled:opacity-60 dark:bg-white dark:text-black"
+            >
+              {loading ? "Generating..." : "Generate full quality"}
+            </button>
+          )}
         </div>
       )}
     </main>
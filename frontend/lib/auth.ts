@@ -12,6 +12,58 @@ export type AuthTokens = {
   tokenType: string
 }
 
+const ACCESS_TOKEN_KEY = "nfw.accessToken"
+
+function storeAccessToken(token: string) {
+  try {
+    window.localStorage.setItem(ACCESS_TOKEN_KEY, token)
+  } catch {
+    // Storage can be unavailable (private mode, blocked cookies); requests just go out anonymously.
+  }
+}
+
+// Seconds since the epoch at which the JWT expires, or null if it can't be read.
+function tokenExpiry(token: string): number | null {
+  try {
+    const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/")
+    const exp = JSON.parse(atob(payload)).exp
+    return typeof exp === "number" ? exp : null
+  } catch {
+    return null
+  }
+}
+
+export function clearAccessToken() {
+  try {
+    window.localStorage.removeItem(ACCESS_TOKEN_KEY)
+  } catch {
+    // Nothing stored, or storage is unavailable.
+  }
+}
+
+export function getAccessToken(): string | null {
+  if (typeof window === "undefined") return null
+  let token: string | null
+  try {
+    token = window.localStorage.getItem(ACCESS_TOKEN_KEY)
+  } catch {
+    return null
+  }
+  if (!token) return null
+  // An expired token is dropped rather than sent, so the user is treated as signed out.
+  const exp = tokenExpiry(token)
+  if (exp === null || exp * 1000 <= Date.now()) {
+    clearAccessToken()
+    return null
+  }
+  return token
+}
+
+export function authHeaders(): Record<string, string> {
+  const token = getAccessToken()
+  return token ? { authorization: `Bearer ${token}` } : {}
+}
+
 async function request<TResponse>(path: string, init: RequestInitWithBody): Promise<TResponse> {
   let res: Response
   try {
@@ -52,6 +104,7 @@ export async function loginUser(input: { email: string; password: string }): Pro
     method: "POST",
     body: JSON.stringify(input),
   })
+  storeAccessToken(result.access_token)
   return { accessToken: result.access_token, tokenType: result.token_type }
 }
 
@@ -83,6 +136,7 @@ export async function oauthSignIn(
     method: "POST",
     body: JSON.stringify(body),
   })
+  storeAccessToken(result.access_token)
   return {
     accessToken: result.access_token,
     tokenType: result.token_type,
@@ -0,0 +1,9 @@
+// Headers to send along when proxying a browser request to the backend.
+//
+// The Next.js server fills in x-forwarded-for with the socket address when no proxy in
+// front of it did, so passing the header on gives the backend the real client address.
+// The backend only honours it because this server is listed in its TRUSTED_PROXIES.
+export function forwardedClientHeaders(req: Request): Record<string, string> {
+  const forwardedFor = req.headers.get("x-forwarded-for")
+  return forwardedFor ? { "x-forwarded-for": forwardedFor } : {}
+}